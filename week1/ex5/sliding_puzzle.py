@@ -0,0 +1,825 @@
+import argparse
+import heapq
+import mmap
+import os
+import random
+import time
+import tracemalloc
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+"""
+a board (=state) is represented as a list of integers where 0 is the hole
+note: a list is an ordered sequence, so [0,1,2] is not the same as [1,0,2]
+note: lists are mutable, tuples are not
+
+the searches use the goal set by set_goal (123 456 780 by default); start-sliding-puzzle.py
+is the demo, and solve_many solves many puzzles in parallel:
+
+    python sliding_puzzle.py puzzles.txt --search ida_star -j 4
+
+the searches pack a board into a single integer, with 4 bits per tile: the tile at
+position i is in bits 4*i..4*i+3. that makes the visited states and the priority queue
+small (one int per state instead of a list), and a move is a few integer operations:
+the hole is 0, so moving a tile t from position q to the hole at p adds t << 4*p and
+subtracts t << 4*q. 4 bits per tile is enough for the 15-puzzle (N=4).
+"""
+
+class PriorityQueue:
+    # a wrapper around heapq (aka priority queue), a binary min-heap on top of a list.
+    def __init__(self):
+        # create a min heap (as a list)
+        self.elements = []
+
+    def empty(self):
+        return len(self.elements) == 0
+
+    # heap elements are tuples (priority, item)
+    def put(self, item, priority):
+        heapq.heappush(self.elements, (priority, item))
+
+    # pop returns the smallest item from the heap
+    # i.e. the root element = element (priority, item) with highest priority
+    def get(self):
+        return heapq.heappop(self.elements)[1]
+
+    # like get, but returns (priority, item)
+    def pop(self):
+        return heapq.heappop(self.elements)
+
+    def __len__(self):
+        return len(self.elements)
+
+def swap(state, hole, neighbor):
+    # input is a board (list), returns a board where hole and neighbor are swapped
+    s = state[:] # make a local copy
+    s[hole], s[neighbor] = s[neighbor], s[hole]
+    return s
+
+def neighbors(state):
+    # input is a board (flat list), returns a tuple of 2..4 neighboring states, depending on the hole
+    n = () # tuple with neighboring states
+    # find index of hole in s
+    i = state.index(0)
+    row = i//N # [0..N-1]
+    # up or down: neighbor in [0..N*N]? then add to tuple
+    if i-N >= 0: n = n + (swap(state, i, i-N),)
+    if i+N < SIZE: n = n + (swap(state, i, i+N),)
+    # left or right: neigbor in current row? then add to tuple
+    if i-1 >= row*N: n = n + (swap(state, i, i-1),)
+    if i+1 < (row+1)*N: n = n + (swap(state, i, i+1),)
+    return n
+
+# ------ packed states --------------------
+
+def pack(state):
+    # input is a board (list or tuple), returns the board packed in an int
+    x = 0
+    for i, tile in enumerate(state):
+        x |= tile << (4 * i)
+    return x
+
+def unpack(x):
+    # input is a packed board, returns the board as a tuple
+    return tuple((x >> (4 * i)) & 15 for i in range(SIZE))
+
+def set_goal(goal):
+    # input is the goal board (list); sets the board size and the tables of the searches
+    # note: the packed states of astar and bfs only fit boards up to the 15-puzzle
+    global SIZE, N, tuple_goal, GOAL, MOVES, DISTANCE, LINES
+    SIZE = len(goal)
+    N = int(SIZE**0.5)
+    tuple_goal = tuple(goal)
+    GOAL = pack(goal)
+    # the positions the hole can move to from every position, in the order of neighbors()
+    MOVES = []
+    for i in range(SIZE):
+        row = i // N
+        MOVES.append(tuple(j for j, ok in ((i - N, i - N >= 0), (i + N, i + N < SIZE),
+                                           (i - 1, i - 1 >= row * N), (i + 1, i + 1 < (row + 1) * N)) if ok))
+    DISTANCE = distance_table(goal)
+    LINES = line_tables(goal)
+
+def distance_table(goal):
+    # input is a board (list); returns a table [tile][position] of the manhattan distance
+    # of tile at position to its position in goal
+    where = [0] * SIZE
+    for i, tile in enumerate(goal):
+        where[tile] = i
+    return [[0 if tile == 0 else abs(i // N - where[tile] // N) + abs(i % N - where[tile] % N)
+             for i in range(SIZE)] for tile in range(SIZE)]
+
+def line_tables(goal):
+    # input is a board (list); returns the goal row and the goal column of every tile, and
+    # the linear conflicts per row (column) and its tiles, filled on use
+    goal_row, goal_col = [0] * SIZE, [0] * SIZE
+    for i, tile in enumerate(goal):
+        goal_row[tile], goal_col[tile] = i // N, i % N
+    return goal_row, goal_col, [{} for _ in range(N)], [{} for _ in range(N)]
+
+def default_goal(size):
+    # the goal with the tiles in order and the hole last, e.g. 123 456 780
+    return list(range(1, size)) + [0]
+
+def solvable(state):
+    # input is a board (list), returns whether the goal can be reached from it
+    # a move swaps the hole with a tile, so it changes the parity of the permutation from
+    # state to the goal, and the parity of the manhattan distance of the hole to its goal
+    # position; both are even in the goal, so they must be equal in a solvable state
+    # (that is also enough: exactly half of the boards are solvable)
+    if sorted(state) != sorted(tuple_goal):
+        return False
+    position = {t: i for i, t in enumerate(tuple_goal)}
+    permutation = [position[t] for t in state]
+    swaps = 0
+    seen = [False] * SIZE
+    for i in range(SIZE):
+        # a cycle of length k is k - 1 swaps
+        length = 0
+        j = i
+        while not seen[j]:
+            seen[j] = True
+            j = permutation[j]
+            length += 1
+        swaps += max(length - 1, 0)
+    hole, goal = state.index(0), tuple_goal.index(0)
+    distance = abs(hole // N - goal // N) + abs(hole % N - goal % N)
+    return swaps % 2 == distance % 2
+
+# ------ heuristics --------------------
+
+def line_removals(goals):
+    # input is the goal columns (rows) of the tiles in a row (column) that belong in it, in
+    # the order they are in; returns how many tiles must leave the line to let the others
+    # pass, i.e. the number of tiles not in a longest increasing subsequence
+    longest = []
+    for i, g in enumerate(goals):
+        longest.append(1 + max((longest[j] for j in range(i) if goals[j] < g), default=0))
+    return len(goals) - max(longest, default=0)
+
+def row_conflicts(x, r, lines=None):
+    # the linear conflicts in row r of packed board x, as the number of tiles to remove;
+    # lines are the line_tables of the goal, those of set_goal by default
+    goal_row, goal_col, tables, _ = lines or LINES
+    bits = (x >> (4 * N * r)) & ((1 << (4 * N)) - 1)
+    table = tables[r]
+    if bits not in table:
+        tiles = [(bits >> (4 * c)) & 15 for c in range(N)]
+        table[bits] = line_removals([goal_col[t] for t in tiles if t and goal_row[t] == r])
+    return table[bits]
+
+def col_conflicts(x, c, lines=None):
+    # the linear conflicts in column c of packed board x, as the number of tiles to remove
+    goal_row, goal_col, _, tables = lines or LINES
+    tiles = tuple((x >> (4 * (c + N * r))) & 15 for r in range(N))
+    table = tables[c]
+    if tiles not in table:
+        table[tiles] = line_removals([goal_row[t] for t in tiles if t and goal_col[t] == c])
+    return table[tiles]
+
+class Manhattan:
+    # the sum of the manhattan distances of the tiles to their goal positions
+    # a heuristic is called with a packed board for its value; update gives the value of a
+    # child from the value of its parent and the move, without looking at the whole board
+    def __init__(self, goal=None):
+        # goal is a board (list) to measure the distance to, instead of the goal of set_goal
+        self.table = distance_table(goal) if goal is not None else None
+
+    def __call__(self, x):
+        table = self.table or DISTANCE
+        return sum(table[(x >> (4 * i)) & 15][i] for i in range(SIZE))
+
+    def update(self, h, x, child, tile, src, dst):
+        # h is the value of x, child is x with tile moved from src to dst (the hole)
+        table = self.table or DISTANCE
+        return h + table[tile][dst] - table[tile][src]
+
+class LinearConflict(Manhattan):
+    # manhattan distance plus 2 moves for every tile that must leave its row or column to
+    # let another tile of that line pass
+    def __init__(self, goal=None):
+        # goal is a board (list) to measure the distance to, instead of the goal of set_goal
+        Manhattan.__init__(self, goal)
+        self.lines = line_tables(goal) if goal is not None else None
+
+    def __call__(self, x):
+        lines = self.lines
+        conflicts = sum(row_conflicts(x, r, lines) + col_conflicts(x, r, lines) for r in range(N))
+        return Manhattan.__call__(self, x) + 2 * conflicts
+
+    def update(self, h, x, child, tile, src, dst):
+        h = Manhattan.update(self, h, x, child, tile, src, dst)
+        # the order of the tiles in a line only changes in the lines the tile leaves and
+        # enters: the columns for a move left or right, the rows for a move up or down
+        if src // N == dst // N:
+            a, b, conflicts = src % N, dst % N, col_conflicts
+        else:
+            a, b, conflicts = src // N, dst // N, row_conflicts
+        lines = self.lines
+        return h + 2 * (conflicts(child, a, lines) + conflicts(child, b, lines) -
+                        conflicts(x, a, lines) - conflicts(x, b, lines))
+
+MANHATTAN = Manhattan()
+LINEAR_CONFLICT = LinearConflict()
+
+def heuristic(state):
+    # input is a board (list), returns an (optimistic) estimate of cost to reach the goal state.
+    return LINEAR_CONFLICT(pack(state))
+
+# ------ searches --------------------
+
+class Stats:
+    # counters of a search
+    def __init__(self):
+        self.expanded = 0   # states taken from the frontier and expanded
+        self.generated = 0  # children made
+        self.stored = 0     # states in the visited set at the end
+
+def make_path(parent, x):
+    # input is a dict packed state => packed parent state (None for the start) and the packed
+    # goal; returns the path as a dict tuple_state => tuple_parent_state, for print_path
+    path = {}
+    while x is not None:
+        p = parent[x]
+        path[unpack(x)] = unpack(p) if p is not None else ()
+        x = p
+    return path
+
+def astar(start, heuristic=LINEAR_CONFLICT, stats=None):
+    # input is a start state (list), returns the path to the goal state and the number of
+    # expanded states
+    # path is a dictionary tuple_state => tuple_parent_state, empty if there is no path
+    # heuristic is called with packed states; if it has an update method (see Manhattan)
+    # the value of a child is computed from the move
+    stats = stats or Stats()
+    if not solvable(start):
+        return {}, 0
+    update = getattr(heuristic, 'update', None)
+    x = pack(start)
+    h = heuristic(x)
+    cost = {x: 0}         # the visited states with their cost so far
+    parent = {x: None}
+    frontier = PriorityQueue()
+    # the priority packs f = g + h (first), h (ties go to states nearer to the goal) and the
+    # position of the hole in one int, so the heap holds (int, int) pairs
+    frontier.put(x, (h << 16) | (h << 8) | start.index(0))
+    while not frontier.empty():
+        priority, x = frontier.pop()
+        f, h, hole = priority >> 16, (priority >> 8) & 255, priority & 255
+        g = f - h
+        if g > cost[x]:
+            continue  # x was reached again by a shorter path after it was put
+        if x == GOAL:
+            stats.stored = len(cost)
+            return make_path(parent, x), stats.expanded
+        stats.expanded += 1
+        for q in MOVES[hole]:
+            tile = (x >> (4 * q)) & 15
+            child = x + (tile << (4 * hole)) - (tile << (4 * q))
+            stats.generated += 1
+            if g + 1 >= cost.get(child, g + 2):
+                continue
+            cost[child] = g + 1
+            parent[child] = x
+            hc = update(h, x, child, tile, q, hole) if update else heuristic(child)
+            frontier.put(child, ((g + 1 + hc) << 16) | (hc << 8) | q)
+    stats.stored = len(cost)
+    return {}, stats.expanded
+
+def bfs(start, stats=None):
+    # breadth-first search on packed states, returns the same as astar
+    stats = stats or Stats()
+    if not solvable(start):
+        return {}, 0
+    x = pack(start)
+    parent = {x: None}
+    frontier = deque([(x, start.index(0))])
+    while frontier:
+        x, hole = frontier.popleft()
+        if x == GOAL:
+            stats.stored = len(parent)
+            return make_path(parent, x), stats.expanded
+        stats.expanded += 1
+        for q in MOVES[hole]:
+            tile = (x >> (4 * q)) & 15
+            child = x + (tile << (4 * hole)) - (tile << (4 * q))
+            stats.generated += 1
+            if child not in parent:
+                parent[child] = x
+                frontier.append((child, q))
+    stats.stored = len(parent)
+    return {}, stats.expanded
+
+def solve(start, search=astar, memory=True, **options):
+    # run a search on start and print its path length, nodes and time, and with memory the
+    # peak memory per stored state (tracemalloc slows the search down)
+    stats = Stats()
+    if memory:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    path, _ = search(start, stats=stats, **options)
+    t1 = time.perf_counter()
+    name = search.__name__
+    if 'heuristic' in options:
+        name += ' ' + type(options['heuristic']).__name__
+    print("{}: {} moves, {} states expanded, {} stored, {:.3f} secs, {:.0f} states/sec"
+          .format(name, len(path) - 1, stats.expanded, stats.stored, t1 - t0,
+                  stats.expanded / max(t1 - t0, 1e-9)))
+    if memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print("    peak memory {:.1f} MB, {:.0f} bytes per stored state".format(peak / 2**20, peak / max(stats.stored, 1)))
+    return path, stats
+
+def scramble(goal, moves, seed):
+    # a board made by moves random moves of the hole from goal, so it is solvable
+    rng = random.Random(seed)
+    state = list(goal)
+    for _ in range(moves):
+        state = rng.choice(neighbors(state))
+    return state
+
+def benchmark(instances=3, moves=400, seed=1):
+    # astar with manhattan distance and with linear conflict on the 8-puzzle below and on
+    # random 15-puzzles
+    set_goal(to_list("123 456 780"))
+    start = to_list("867 254 301")
+    for h in (MANHATTAN, LINEAR_CONFLICT):
+        print("8-puzzle", display(tuple(start)), type(h).__name__)
+        solve(start, astar, heuristic=h)
+    solve(start, bfs)
+    set_goal(to_list("1234 5678 9abc def0"))
+    for i in range(instances):
+        start = scramble(tuple_goal, moves, seed + i)
+        for h in (MANHATTAN, LINEAR_CONFLICT):
+            print("15-puzzle", display(tuple(start)), type(h).__name__)
+            solve(start, astar, heuristic=h)
+
+# ------ bidirectional search --------------------
+
+"""
+bidirectional search runs one search forward from the start and one backward from the
+goal (moves are reversible, so backward is the same as forward from the goal), until they
+meet in the middle. two searches of depth d/2 expand far fewer states than one of depth d.
+
+bidirectional_bfs expands a whole layer of the smaller side at a time; the best meeting
+in that layer is a shortest path.
+
+bidirectional_astar is front-to-end: the forward search uses the distance to the goal,
+the backward search the distance to the start (Manhattan and LinearConflict take the
+board to measure to). it expands the side with the smaller frontier, and keeps the
+length mu of the best path through a state both sides reached; it stops when the
+smallest f of one of the frontiers is >= mu, then no path can be shorter (the
+heuristics are consistent). it is in SEARCHES, but not the default: with heuristics this
+good it is no large cut like bidirectional_bfs over bfs. on the hard 8-puzzles of
+benchmark_bidirectional it expands 0.6 to 0.95 times the states of astar with the same
+heuristic, and is about as fast; the benchmark prints the comparison.
+"""
+
+def join_path(forward, backward, x):
+    # input is the parent dicts of the forward and the backward search and the packed state
+    # where they meet; returns the path as a dict tuple_state => tuple_parent_state
+    path = make_path(forward, x)
+    while backward[x] is not None:
+        path[unpack(backward[x])] = unpack(x)
+        x = backward[x]
+    return path
+
+def bidirectional_bfs(start, stats=None):
+    # input is a start state (list), returns the path to the goal state and the number of
+    # expanded states, like bfs
+    stats = stats or Stats()
+    if not solvable(start):
+        return {}, 0
+    x = pack(start)
+    if x == GOAL:
+        return make_path({x: None}, x), 0
+    # per side: the parent of every visited state, its depth, and the states of the last layer
+    parents = ({x: None}, {GOAL: None})
+    depths = ({x: 0}, {GOAL: 0})
+    layers = ([(x, start.index(0))], [(GOAL, tuple_goal.index(0))])
+    while layers[0] and layers[1]:
+        side = 0 if len(layers[0]) <= len(layers[1]) else 1
+        parent, depth, other = parents[side], depths[side], depths[1 - side]
+        best, meet = float('INF'), None
+        layer = []
+        for x, hole in layers[side]:
+            stats.expanded += 1
+            d = depth[x] + 1
+            for q in MOVES[hole]:
+                tile = (x >> (4 * q)) & 15
+                child = x + (tile << (4 * hole)) - (tile << (4 * q))
+                stats.generated += 1
+                if child in parent:
+                    continue
+                parent[child] = x
+                depth[child] = d
+                layer.append((child, q))
+                if child in other and d + other[child] < best:
+                    best, meet = d + other[child], child
+        if meet is not None:
+            stats.stored = len(parents[0]) + len(parents[1])
+            return join_path(parents[0], parents[1], meet), stats.expanded
+        layers = (layer, layers[1]) if side == 0 else (layers[0], layer)
+    stats.stored = len(parents[0]) + len(parents[1])
+    return {}, stats.expanded
+
+def bidirectional_astar(start, heuristic=LINEAR_CONFLICT, stats=None):
+    # input is a start state (list), returns the path to the goal state and the number of
+    # expanded states, like astar. the forward search uses heuristic, the backward search
+    # the same kind of heuristic to the start
+    stats = stats or Stats()
+    if not solvable(start):
+        return {}, 0
+    x = pack(start)
+    # forward from the start to the goal, backward from the goal to the start
+    heuristics = (heuristic, type(heuristic)(start))
+    costs = ({x: 0}, {GOAL: 0})
+    parents = ({x: None}, {GOAL: None})
+    frontiers = (PriorityQueue(), PriorityQueue())
+    for side, y, hole in ((0, x, start.index(0)), (1, GOAL, tuple_goal.index(0))):
+        h = heuristics[side](y)
+        frontiers[side].put(y, (h << 16) | (h << 8) | hole)
+    mu, meet = (0, x) if x == GOAL else (float('INF'), None)
+    while not frontiers[0].empty() and not frontiers[1].empty():
+        # the smallest f of a frontier is a lower bound of any path through it
+        if max(frontiers[0].elements[0][0], frontiers[1].elements[0][0]) >> 16 >= mu:
+            break
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        cost, parent, other, frontier, heuristic = (
+            costs[side], parents[side], costs[1 - side], frontiers[side], heuristics[side])
+        priority, x = frontier.pop()
+        f, h, hole = priority >> 16, (priority >> 8) & 255, priority & 255
+        g = f - h
+        if g > cost[x]:
+            continue  # x was reached again by a shorter path after it was put
+        stats.expanded += 1
+        for q in MOVES[hole]:
+            tile = (x >> (4 * q)) & 15
+            child = x + (tile << (4 * hole)) - (tile << (4 * q))
+            stats.generated += 1
+            if g + 1 >= cost.get(child, g + 2):
+                continue
+            cost[child] = g + 1
+            parent[child] = x
+            if child in other and g + 1 + other[child] < mu:
+                mu, meet = g + 1 + other[child], child
+            hc = heuristic.update(h, x, child, tile, q, hole)
+            frontier.put(child, ((g + 1 + hc) << 16) | (hc << 8) | q)
+    stats.stored = len(costs[0]) + len(costs[1])
+    if meet is None:
+        return {}, stats.expanded
+    return join_path(parents[0], parents[1], meet), stats.expanded
+
+def benchmark_bidirectional(starts=("867 254 301", "647 850 321", "806 547 231")):
+    # states expanded and time of the bidirectional searches against bfs and astar, on
+    # hard 8-puzzles (31, 31 and 27 moves)
+    set_goal(default_goal(9))
+    searches = ((bfs, {}), (bidirectional_bfs, {}), (astar, {'heuristic': MANHATTAN}),
+                (astar, {'heuristic': LINEAR_CONFLICT}), (bidirectional_astar, {'heuristic': MANHATTAN}),
+                (bidirectional_astar, {'heuristic': LINEAR_CONFLICT}))
+    for s in starts:
+        print("8-puzzle", s)
+        expanded = {}
+        for search, options in searches:
+            _, stats = solve(to_list(s), search, memory=False, **options)
+            expanded[search.__name__, type(options.get('heuristic')).__name__] = stats.expanded
+        for name in ('Manhattan', 'LinearConflict'):
+            a, b = expanded['astar', name], expanded['bidirectional_astar', name]
+            print("    bidirectional_astar {} expands {:.2f}x the states of astar ({} vs {})"
+                  .format(name, b / a, b, a))
+
+# ------ IDA* with pattern databases --------------------
+
+"""
+IDA* is a depth-first search with a bound on f = g + h, that is raised to the smallest f
+over the bound after every iteration. it only keeps the current path, so it needs O(depth)
+memory where A* runs out of memory on hard 15-puzzles.
+
+the heuristic is additive disjoint pattern databases: the tiles are split in groups (the
+patterns), and a pattern database holds, for every placement of the tiles of a pattern,
+the least number of moves of these tiles to bring them to their goal (moves of the other
+tiles are free). a move only moves tiles of one pattern, so the sum over the patterns is
+a lower bound of the moves to the goal, and a much better one than manhattan distance.
+
+the databases are built offline with a breadth-first search backwards from the goal, in
+NumPy over all states of a layer at once. a state is the positions of the pattern tiles
+and of the hole, with BITS bits per position; moving the hole to an empty cell costs 0,
+moving it to a pattern tile costs 1. the database is then the minimum over the positions
+of the hole: one byte per placement of the tiles, indexed by their positions. it's saved
+as a file of bytes, and memory-mapped when it is used.
+"""
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+UNKNOWN = 255  # an entry of a placement that can't happen, like two tiles in one cell
+
+def bits():
+    # bits per position, 4 for the 15-puzzle and 5 for the 24-puzzle
+    return (SIZE - 1).bit_length()
+
+def default_patterns():
+    # groups of 5 tiles for the 15-puzzle and of 4 tiles for the 24-puzzle (the databases
+    # of 6 tiles are too big to build this way), by goal position
+    tiles = sorted((t for t in tuple_goal if t), key=tuple_goal.index)
+    k = 5 if SIZE <= 16 else 4
+    return [tuple(tiles[i:i + k]) for i in range(0, len(tiles), k)]
+
+def build_pattern_database(pattern):
+    # input is a tuple of tiles, returns the pattern database as bytes
+    import numpy as np
+    B = bits()
+    mask = (1 << B) - 1
+    k = len(pattern)
+    # key = hole | position of pattern[i] << B*(i+1)
+    distance = np.full(1 << (B * (k + 1)), UNKNOWN, dtype=np.uint8)
+    goal = tuple_goal.index(0)
+    for i, t in enumerate(pattern):
+        goal |= tuple_goal.index(t) << (B * (i + 1))
+    distance[goal] = 0
+    frontier = np.array([goal], dtype=np.int64)
+    d = 0
+    while len(frontier):
+        children = []
+        while len(frontier):
+            hole = frontier & mask
+            row = hole // N
+            free = []
+            for step, valid in ((-N, hole - N >= 0), (N, hole + N < SIZE),
+                                (-1, hole - 1 >= row * N), (1, hole + 1 < (row + 1) * N)):
+                keys, holes = frontier[valid], hole[valid]
+                new = holes + step
+                moved = (keys & ~mask) | new
+                tile = np.zeros(len(keys), dtype=bool)
+                for i in range(k):
+                    here = ((keys >> (B * (i + 1))) & mask) == new
+                    # the tile goes to where the hole was
+                    moved[here] += (holes[here] - new[here]) << (B * (i + 1))
+                    tile |= here
+                free.append(moved[~tile])
+                children.append(moved[tile])
+            # the states reached with free moves have the same distance
+            frontier = np.unique(np.concatenate(free))
+            frontier = frontier[distance[frontier] == UNKNOWN]
+            distance[frontier] = d
+        d += 1
+        frontier = np.unique(np.concatenate(children))
+        frontier = frontier[distance[frontier] == UNKNOWN]
+        distance[frontier] = d
+    # the least distance over the positions of the hole
+    return distance.reshape(-1, 1 << B).min(axis=1).tobytes()
+
+def pattern_path(pattern, directory=DIRECTORY):
+    # the file of a pattern database; it depends on the board size and the goal positions
+    # of the tiles of the pattern
+    places = '_'.join('{}-{}'.format(t, tuple_goal.index(t)) for t in pattern)
+    return os.path.join(directory, 'pdb{}_{}.bin'.format(SIZE, places))
+
+class PatternDatabases:
+    # the databases of patterns, memory-mapped from their files (built and saved first if
+    # there is no file yet)
+    def __init__(self, patterns=None, directory=DIRECTORY):
+        self.patterns = patterns or default_patterns()
+        self.files = []
+        self.tables = []
+        # for every tile its pattern, and the shift of its position in the index of the pattern
+        self.group = [0] * SIZE
+        self.shift = [0] * SIZE
+        for g, pattern in enumerate(self.patterns):
+            path = pattern_path(pattern, directory)
+            if not os.path.exists(path):
+                t0 = time.perf_counter()
+                table = build_pattern_database(pattern)
+                with open(path, 'wb') as f:
+                    f.write(table)
+                print("built pattern database {} in {:.1f} secs".format(path, time.perf_counter() - t0))
+            f = open(path, 'rb')
+            self.files.append(f)
+            self.tables.append(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            for i, t in enumerate(pattern):
+                self.group[t] = g
+                self.shift[t] = bits() * i
+
+    def indexes(self, state):
+        # input is a board (list), returns the index in every database
+        idx = [0] * len(self.patterns)
+        for i, t in enumerate(state):
+            if t:
+                idx[self.group[t]] += i << self.shift[t]
+        return idx
+
+    def __call__(self, state):
+        # input is a board (list), returns the sum of the databases
+        return sum(table[i] for table, i in zip(self.tables, self.indexes(state)))
+
+    def close(self):
+        for table, f in zip(self.tables, self.files):
+            table.close()
+            f.close()
+
+def ida_star(start, databases=None, stats=None):
+    # input is a start state (list), returns the path to the goal state and the number of
+    # expanded states, like astar
+    stats = stats or Stats()
+    if not solvable(start):
+        return {}, 0
+    databases = databases or PatternDatabases()
+    tables, group, shift = databases.tables, databases.group, databases.shift
+    board = list(start)
+    idx = databases.indexes(board)
+    moves = []  # the positions the hole moved to
+
+    def search(hole, g, h, bound, previous):
+        # depth-first search below hole with f <= bound; returns -1 when the goal is found
+        # (the moves are left in moves), else the smallest f over the bound
+        if h == 0:
+            return -1  # all tiles are in their goal position
+        stats.expanded += 1
+        minimum = float('INF')
+        for q in MOVES[hole]:
+            if q == previous:
+                continue  # don't undo the last move
+            tile = board[q]
+            p = group[tile]
+            table = tables[p]
+            old = idx[p]
+            new = old + ((hole - q) << shift[tile])
+            hc = h - table[old] + table[new]
+            stats.generated += 1
+            if g + 1 + hc > bound:
+                minimum = min(minimum, g + 1 + hc)
+                continue
+            board[hole], board[q] = tile, 0
+            idx[p] = new
+            moves.append(q)
+            f = search(q, g + 1, hc, bound, hole)
+            if f < 0:
+                return f
+            moves.pop()
+            idx[p] = old
+            board[hole], board[q] = 0, tile
+            minimum = min(minimum, f)
+        return minimum
+
+    h = sum(table[i] for table, i in zip(tables, idx))
+    bound = h
+    while True:
+        f = search(board.index(0), 0, h, bound, -1)
+        if f < 0:
+            break
+        if f == float('INF'):
+            return {}, stats.expanded
+        bound = f
+
+    # the path as a dict tuple_state => tuple_parent_state, for print_path
+    state = list(start)
+    path = {tuple(state): ()}
+    for q in moves:
+        parent = tuple(state)
+        hole = state.index(0)
+        state[hole], state[q] = state[q], 0
+        path[tuple(state)] = parent
+    return path, stats.expanded
+
+# hard 15-puzzles from Korf's 100 random instances (1985), with the goal 0 1 2 ... 15 (the
+# hole first), and their optimal number of moves
+KORF = [
+    ("14 13 15 7 11 12 9 5 6 0 2 1 4 8 10 3", 57),
+    ("13 5 4 10 9 12 8 14 2 3 7 1 0 15 11 6", 55),
+    ("14 7 8 2 13 11 10 4 9 12 5 0 3 6 1 15", 59),
+    ("5 12 10 7 15 11 14 0 8 2 1 13 3 4 9 6", 56),
+    ("14 7 1 9 12 3 6 15 8 11 2 5 10 0 4 13", 52),
+]
+
+def benchmark_ida(instances=KORF):
+    # ida_star with the 5-5-5 pattern databases on hard 15-puzzles: moves, time and nodes/sec
+    set_goal(list(range(16)))
+    databases = PatternDatabases()
+    total_nodes = total_time = 0
+    for s, optimal in instances:
+        stats = Stats()
+        t0 = time.perf_counter()
+        path, _ = ida_star(to_list(s), databases, stats)
+        t1 = time.perf_counter()
+        assert len(path) - 1 == optimal, (s, len(path) - 1, optimal)
+        total_nodes += stats.expanded
+        total_time += t1 - t0
+        print("{}: {} moves, {} nodes expanded in {:.2f} secs, {:.0f} nodes/sec"
+              .format(display(tuple(to_list(s))), len(path) - 1, stats.expanded, t1 - t0, stats.expanded / (t1 - t0)))
+    print("total: {} nodes in {:.2f} secs, {:.0f} nodes/sec".format(total_nodes, total_time, total_nodes / total_time))
+    databases.close()
+
+# ------ batch solving --------------------
+
+# the searches for solve_many, by name
+SEARCHES = {'astar': astar, 'bfs': bfs, 'ida_star': ida_star, 'bidirectional_bfs': bidirectional_bfs,
+            'bidirectional_astar': bidirectional_astar}
+
+Result = namedtuple('Result', 'start moves expanded seconds')  # moves is -1 for an unsolvable start
+
+# the search of a worker process and its pattern databases, set by init_worker
+worker_search = None
+worker_databases = None
+
+def init_worker(goal, search):
+    # every worker maps the same pattern database files, so the tables are in memory once
+    global worker_search, worker_databases
+    set_goal(goal)
+    worker_search = SEARCHES[search]
+    if worker_search is ida_star:
+        worker_databases = PatternDatabases()
+
+def solve_one(start):
+    # input is a start state (list), returns its Result with the search of the worker
+    stats = Stats()
+    t0 = time.perf_counter()
+    if not solvable(start):
+        return Result(start, -1, 0, time.perf_counter() - t0)
+    if worker_databases is not None:
+        path, _ = worker_search(start, worker_databases, stats)
+    else:
+        path, _ = worker_search(start, stats=stats)
+    return Result(start, len(path) - 1, stats.expanded, time.perf_counter() - t0)
+
+def solve_many(starts, goal=None, search='ida_star', workers=None):
+    # input is a list of start states (lists or strings), returns a Result per start, in order
+    # the starts are solved in parallel; goal is the goal of set_goal when its size fits the
+    # starts, else the default goal
+    starts = [to_list(s) if isinstance(s, str) else list(s) for s in starts]
+    if not starts:
+        return []
+    if goal is None:
+        goal = tuple_goal if len(tuple_goal) == len(starts[0]) else default_goal(len(starts[0]))
+    set_goal(list(goal))
+    if search == 'ida_star':
+        # build the missing pattern databases once, before the workers map them
+        PatternDatabases().close()
+    with ProcessPoolExecutor(workers or os.cpu_count(), initializer=init_worker, initargs=(list(goal), search)) as executor:
+        return list(executor.map(solve_one, starts))
+
+def read_puzzles(path):
+    # the start states in a file, one per line (as for to_list); empty lines and lines that
+    # start with # are skipped
+    with open(path) as f:
+        return [to_list(line) for line in f if line.strip() and not line.startswith('#')]
+
+def print_results(results):
+    for r in results:
+        if r.moves < 0:
+            print("{}: unsolvable".format(display(tuple(r.start))))
+        else:
+            print("{}: {} moves, {} states expanded, {:.3f} secs"
+                  .format(display(tuple(r.start)), r.moves, r.expanded, r.seconds))
+    solved = [r for r in results if r.moves >= 0]
+    print("{} puzzles, {} solved, {} states expanded, {:.3f} secs in total"
+          .format(len(results), len(solved), sum(r.expanded for r in solved), sum(r.seconds for r in results)))
+
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+def display(state):
+    # input is state (tuple), returns a string representation for printing
+    # tiles are digits in base 36, so the rows of the 15- and 24-puzzle line up too
+    s = "".join(DIGITS[x] for x in state)
+    return ' '.join(s[i:i+N] for i in range(0, SIZE, N))
+
+def print_path(path):
+    # input is a dict tuple_state => tuple_parent_state
+    # print the path from start to goal
+    if tuple_goal not in path:
+        print("no path")
+        return
+    state_list = []
+    s = tuple_goal
+    # put all states as strings in a list
+    while s:    # an empty tuple is False
+        state_list.append(display(s))
+        s = path[s]
+    # print states from start to goal
+    for x in state_list[::-1]:
+        print(x.replace(' ', '\n') + '\n')
+
+def to_list(s):
+    # input is a string of space-separated rows filled with N numbers, where
+    # 0 represents the hole; returns a list of size N^2
+    # the tiles of a 15-puzzle are written as hex digits ("1234 5678 9abc def0"), or all
+    # tiles are separated by spaces ("1 2 3 4 5 6 7 8 9 10 11 12 13 14 15 0")
+    tiles = s.split()
+    if any(len(x) != len(tiles) for x in tiles):
+        return [int(x) for x in tiles]
+    return [DIGITS.index(x) for x in "".join(tiles).lower()]
+
+# the goal until set_goal is called again
+set_goal(default_goal(9))
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Solve sliding puzzles from a file, in parallel.')
+    parser.add_argument('path', help='file with a start state per line, like 867 254 301')
+    parser.add_argument('--goal', default=None, help='goal state (default: tiles in order, hole last)')
+    parser.add_argument('--search', choices=SEARCHES, default='ida_star')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='puzzles solved at once, one per process (default: one per core)')
+    options = parser.parse_args(args)
+
+    goal = to_list(options.goal) if options.goal else None
+    print_results(solve_many(read_puzzles(options.path), goal, options.search, options.workers))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+from typing import List
+
+import numpy as np
+
+from tsp import City, make_cities, nearest_neighbour, time_tsp, tour_length, try_all_tours
+
+"""
+
+Held-Karp: an exact TSP solver with dynamic programming over subsets.
+
+Fix a start city, and number the other m = n-1 cities 0..m-1. A subset S of them is a
+bitmask (bit j is set when city j is in S). Then
+
+    cost[S][j] = length of the shortest path that starts at the start city, visits
+                 exactly the cities in S, and ends in city j (in S)
+               = min over k in S-{j} of cost[S-{j}][k] + d(k, j)
+
+and the shortest tour is the min over j of cost[all][j] + d(j, start). This takes
+O(2^m * m^2) time and O(2^m * m) memory instead of the (n-1)! tours of try_all_tours,
+so 20+ cities can be solved exactly.
+
+cost and the parent (the best k, to find the tour back) are NumPy arrays of 2^m rows
+and m columns. The subsets are handled in layers of equal size, and each layer is
+computed for all its subsets at once. With an upper bound, like the length of the
+nearest_neighbour tour, paths that can't be completed into a shorter tour are pruned,
+and subsets without any remaining path are skipped in the next layer.
+"""
+
+def distance_matrix(cities: List[City]) -> np.ndarray:
+    xy = np.array([(c.x, c.y) for c in cities], dtype=float)
+    diff = xy[:, np.newaxis, :] - xy[np.newaxis, :, :]
+    return np.hypot(diff[..., 0], diff[..., 1])
+
+def held_karp_order(D: np.ndarray, upper_bound: float = float('INF')):
+    # shortest tour for distance matrix D, starting in city 0; returns (length, order, pruned)
+    # where pruned is the number of paths that were cut off by upper_bound
+    n = len(D)
+    if n <= 3:
+        order = list(range(n))
+        return sum(D[order[i - 1], order[i]] for i in range(n)) if n > 1 else 0.0, order, 0
+    m = n - 1
+    # the cities other than the start are 1..n-1 in D, and 0..m-1 in the masks
+    inner = D[1:, 1:]
+    to_start = D[1:, 0]
+    cost = np.full((1 << m, m), np.inf)
+    parent = np.zeros((1 << m, m), dtype=np.int8)
+    for j in range(m):
+        cost[1 << j, j] = D[0, j + 1]
+
+    # group the subsets by their number of cities
+    masks = np.arange(1 << m)
+    size = np.zeros(1 << m, dtype=np.int8)
+    for j in range(m):
+        size += (masks >> j) & 1
+    layers = np.argsort(size, kind='stable')
+    bounds = np.searchsorted(size[layers], np.arange(m + 2))
+
+    pruned = 0
+    for k in range(2, m + 1):
+        layer = layers[bounds[k]:bounds[k + 1]]
+        for j in range(m):
+            subsets = layer[(layer >> j) & 1 == 1]
+            before = subsets ^ (1 << j)
+            # skip the subsets that have no path left to extend
+            if upper_bound < np.inf:
+                alive = np.isfinite(cost[before]).any(axis=1)
+                subsets, before = subsets[alive], before[alive]
+            candidates = cost[before] + inner[:, j]
+            best = np.argmin(candidates, axis=1)
+            best_cost = candidates[np.arange(len(subsets)), best]
+            # a path ending in j needs at least d(j, start) more to close the tour
+            if upper_bound < np.inf:
+                too_long = best_cost + to_start[j] > upper_bound
+                pruned += int(np.count_nonzero(too_long & np.isfinite(best_cost)))
+                best_cost[too_long] = np.inf
+            cost[subsets, j] = best_cost
+            parent[subsets, j] = best
+
+    full = (1 << m) - 1
+    total = cost[full] + to_start
+    j = int(np.argmin(total))
+    length = float(total[j])
+
+    # walk back from the last city to the start
+    order = []
+    mask = full
+    while mask:
+        order.append(j + 1)
+        j, mask = int(parent[mask, j]), mask ^ (1 << j)
+    order.append(0)
+    return length, order[::-1], pruned
+
+def held_karp(cities, upper_bound: bool = False) -> List[City]:
+    # exact shortest tour; with upper_bound, the nearest_neighbour tour gives an upper bound
+    # for pruning. the bound only prunes paths that are already too long without the rest of
+    # the cities, so it pays off when nearest_neighbour is close to optimal
+    cities = list(cities)
+    bound = float('INF')
+    if upper_bound and len(cities) > 3:
+        # a little slack, so rounding doesn't prune the optimal tour when nearest_neighbour finds it
+        bound = tour_length(nearest_neighbour(cities)) * (1 + 1e-9)
+    _, order, _ = held_karp_order(distance_matrix(cities), bound)
+    return [cities[i] for i in order]
+
+def benchmark(sizes=(8, 10, 12, 15, 18, 20), brute_force_up_to: int = 9):
+    # time and peak memory of held_karp, with and without upper bound, and of try_all_tours
+    # for small instances
+    for n in sizes:
+        cities = list(make_cities(n))
+        runs = [('held_karp', held_karp),
+                ('held_karp with upper bound', lambda cities: held_karp(cities, upper_bound=True))]
+        if n <= brute_force_up_to:
+            runs.append(('try_all_tours', lambda cities: try_all_tours(frozenset(cities))))
+        for name, run in runs:
+            time_tsp(run, cities, name, memory=True)
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,206 @@
+import argparse
+import csv
+import importlib
+import mmap
+import os
+import struct
+import time
+
+from collections import defaultdict
+from typing import Iterable, Iterator, List
+
+from tsp import City, tour_length
+
+"""
+
+Reading TSP instances from files and writing tours, for batch jobs without plotting.
+
+Cities can be read from:
+
+- TSPLIB files (.tsp) with a NODE_COORD_SECTION, like the instances at
+  http://comopt.ifi.uni-heidelberg.de/software/TSPLIB95/
+- CSV files (.csv) with x and y in the first two columns, and an optional header line
+- binary files (.bin) of x, y pairs as little-endian doubles. These are memory-mapped,
+  so opening millions of cities is instant and only the cities that are used are read.
+
+Tours are written in the TSPLIB tour format (city numbers from 1, ending with -1), one
+city at a time, so a tour is never built as one big string. Or as CSV of x, y.
+
+    python instances.py a280.tsp berlin52.tsp --algorithm local_search --output tours
+
+solves every instance with the algorithm, and writes the tours to the output directory.
+Nothing here imports matplotlib; only the algorithm that is used is imported.
+"""
+
+COORDINATES = struct.Struct('<dd')  # x, y
+
+# the algorithms for the command line, as module:function, imported on use
+ALGORITHMS = {
+    'nearest_neighbour': 'tsp:nearest_neighbour',
+    'two_opt': 'tsp:two_opt',
+    'two_opt_np': 'two_opt_np:two_opt_np',
+    'local_search': 'local_search:local_search',
+    'multi_start': 'multistart:multi_start',
+    'held_karp': 'held_karp:held_karp',
+}
+
+# -----------------------------------------------------------------------------
+# Reading
+
+def read_tsplib(path: str) -> List[City]:
+    # the cities of a TSPLIB file, in the order of their numbers
+    # note: distances are the exact euclidean ones of tsp.distance, not rounded like EUC_2D
+    cities = []
+    with open(path) as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            key, value = key.strip().upper(), value.strip()
+            if key == 'EDGE_WEIGHT_TYPE' and value not in ('EUC_2D', 'CEIL_2D', 'GEO', 'ATT'):
+                raise ValueError('{}: EDGE_WEIGHT_TYPE {} has no coordinates'.format(path, value))
+            if key == 'NODE_COORD_SECTION':
+                break
+        else:
+            raise ValueError('{}: no NODE_COORD_SECTION'.format(path))
+        for line in f:
+            fields = line.split()
+            if not fields or fields[0] == 'EOF':
+                break
+            cities.append(City(float(fields[1]), float(fields[2])))
+    return cities
+
+def read_csv(path: str) -> List[City]:
+    # the cities of a CSV file with x, y in the first two columns; a first line that isn't
+    # numbers is taken as a header
+    cities = []
+    with open(path, newline='') as f:
+        for row in csv.reader(f):
+            if not row:
+                continue
+            try:
+                cities.append(City(float(row[0]), float(row[1])))
+            except ValueError:
+                if cities:
+                    raise
+    return cities
+
+class MappedCities:
+    # the cities of a binary file, memory-mapped; a read-only sequence of City
+    def __init__(self, path: str):
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        if size % COORDINATES.size:
+            raise ValueError('{}: size {} is not a multiple of {}'.format(path, size, COORDINATES.size))
+        # an empty file can't be memory-mapped
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self.size = size // COORDINATES.size
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, i: int) -> City:
+        if i < 0:
+            i += self.size
+        if not 0 <= i < self.size:
+            raise IndexError(i)
+        return City(*COORDINATES.unpack_from(self.data, i * COORDINATES.size))
+
+    def __iter__(self) -> Iterator[City]:
+        return (City(x, y) for x, y in COORDINATES.iter_unpack(self.data))
+
+    def coordinates(self):
+        # the coordinates as an n x 2 NumPy array on the mapped file, without copying
+        import numpy as np
+        return np.frombuffer(self.data, dtype='<f8').reshape(-1, 2)
+
+    def close(self):
+        if self.size:
+            self.data.close()
+        self.file.close()
+
+def read_binary(path: str) -> MappedCities:
+    return MappedCities(path)
+
+READERS = {'.tsp': read_tsplib, '.csv': read_csv, '.bin': read_binary}
+
+def read_cities(path: str):
+    # the cities of a file, read according to its extension
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in READERS:
+        raise ValueError('{}: unknown extension, expected one of {}'.format(path, ', '.join(READERS)))
+    return READERS[extension](path)
+
+# -----------------------------------------------------------------------------
+# Writing
+
+def write_binary(cities: Iterable[City], path: str):
+    # write cities as a binary file for MappedCities, one city at a time
+    with open(path, 'wb') as f:
+        for c in cities:
+            f.write(COORDINATES.pack(c.x, c.y))
+
+def tour_order(cities: Iterable[City], tour: Iterable[City]) -> Iterator[int]:
+    # the indexes in cities of the cities of tour; cities at the same place get the
+    # indexes of that place in turn
+    indexes = defaultdict(list)
+    for i, c in enumerate(cities):
+        indexes[c].append(i)
+    for places in indexes.values():
+        places.reverse()
+    for c in tour:
+        yield indexes[c].pop()
+
+def write_tour(order: Iterable[int], path: str, name: str = 'tour', dimension: int = None):
+    # write a tour, given as indexes of the cities, in the TSPLIB tour format
+    with open(path, 'w') as f:
+        f.write('NAME : {}\nTYPE : TOUR\n'.format(name))
+        if dimension is not None:
+            f.write('DIMENSION : {}\n'.format(dimension))
+        f.write('TOUR_SECTION\n')
+        for i in order:
+            f.write('{}\n'.format(i + 1))
+        f.write('-1\nEOF\n')
+
+def write_tour_csv(tour: Iterable[City], path: str):
+    # write the cities of a tour as CSV, in the order of the tour
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(('x', 'y'))
+        for c in tour:
+            writer.writerow((c.x, c.y))
+
+# -----------------------------------------------------------------------------
+# Batch solving
+
+def load_algorithm(name: str):
+    module, function = ALGORITHMS[name].split(':')
+    return getattr(importlib.import_module(module), function)
+
+def solve_file(path: str, algorithm, output: str = None):
+    # solve the instance in path, write the tour to the output directory (if given), and
+    # return the tour
+    cities = read_cities(path)
+    t0 = time.perf_counter()
+    tour = algorithm(cities)
+    t1 = time.perf_counter()
+    print('{}: {} city tour with length {:.1f} in {:.3f} secs for {}'
+          .format(path, len(tour), tour_length(tour), t1 - t0, algorithm.__name__))
+    if output is not None:
+        name = os.path.splitext(os.path.basename(path))[0]
+        write_tour(tour_order(cities, tour), os.path.join(output, name + '.tour'), name, len(cities))
+    return tour
+
+def main(args: List[str] = None):
+    parser = argparse.ArgumentParser(description='Solve TSP instances from files, without plotting.')
+    parser.add_argument('paths', nargs='+', help='.tsp, .csv or .bin files')
+    parser.add_argument('-a', '--algorithm', choices=ALGORITHMS, default='local_search')
+    parser.add_argument('-o', '--output', default=None, help='directory for the .tour files')
+    options = parser.parse_args(args)
+
+    algorithm = load_algorithm(options.algorithm)
+    if options.output is not None:
+        os.makedirs(options.output, exist_ok=True)
+    for path in options.paths:
+        solve_file(path, algorithm, options.output)
+
+if __name__ == '__main__':
+    main()
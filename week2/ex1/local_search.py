@@ -0,0 +1,198 @@
+import math
+import time
+
+from collections import deque
+from typing import List
+
+from spatial import KDTree
+from tsp import City, make_cities, nearest_neighbour, time_tsp, two_opt
+
+"""
+
+Local search for the TSP with 2-opt and Or-opt moves.
+
+- 2-opt: remove two edges and reconnect the tour the other way, which reverses the
+  part of the tour in between.
+- Or-opt: move a segment of 1 to 3 consecutive cities to another place in the tour,
+  in either orientation.
+
+Two tricks keep this fast:
+
+- neighbour lists: a move is only worth trying when it adds an edge from a city to one
+  of its k nearest cities, and the neighbours are tried nearest first, until they are
+  further away than the edge that would be removed.
+- don't-look bits: a city is only looked at again when one of its tour edges changed.
+  The cities to look at are kept in a queue; when it is empty, no move improves the
+  tour, i.e. the tour is a local optimum and the search stops.
+
+The tour is kept as an array of cities with the position of every city, so the next and
+previous city are found in O(1). Reversing a part of the tour reverses the shorter side
+(reversing the other side gives the same tour, walked the other way round).
+
+local_search(cities) is an algorithm like the ones in tsp.py, e.g.
+
+    plot_tsp(local_search, make_cities(500))
+"""
+
+# number of nearest neighbours per city
+NEIGHBOURS = 8
+# longest segment that Or-opt moves
+SEGMENT = 3
+# gains below this are rounding errors, not improvements
+EPSILON = 1e-9
+
+def neighbour_lists(cities: List[City], k: int = NEIGHBOURS) -> List[List[int]]:
+    # the indexes of the k nearest cities of every city, nearest first
+    tree = KDTree(cities)
+    return [[j for j in tree.nearest_k(c.x, c.y, k + 1) if j != i][:k] for i, c in enumerate(cities)]
+
+class Tour:
+    # a tour as an array of city indexes, with the position of every city in the array
+    def __init__(self, cities: List[City], order: List[int]):
+        self.xs = [c.x for c in cities]
+        self.ys = [c.y for c in cities]
+        self.order = list(order)
+        self.pos = [0] * len(order)
+        for i, c in enumerate(self.order):
+            self.pos[c] = i
+
+    def next(self, c: int) -> int:
+        return self.order[(self.pos[c] + 1) % len(self.order)]
+
+    def prev(self, c: int) -> int:
+        return self.order[self.pos[c] - 1]
+
+    def d(self, a: int, b: int) -> float:
+        return math.hypot(self.xs[a] - self.xs[b], self.ys[a] - self.ys[b])
+
+    def reverse_path(self, b: int, c: int):
+        # reverse the path from b forward to c, or the rest of the tour if that is shorter
+        order, pos = self.order, self.pos
+        n = len(order)
+        i, j = pos[b], pos[c]
+        length = (j - i) % n + 1
+        if 2 * length > n:
+            i, j = (j + 1) % n, (i - 1) % n
+            length = n - length
+        for _ in range(length // 2):
+            ci, cj = order[i], order[j]
+            order[i], order[j] = cj, ci
+            pos[cj], pos[ci] = i, j
+            i = (i + 1) % n
+            j = (j - 1) % n
+
+    def move(self, a: int, b: int, c: int, d: int):
+        # 2-opt move: replace the tour edges (a, b) and (c, d) by (a, c) and (b, d), where
+        # the tour runs a, b, ..., c, d in one of its two directions
+        if self.next(a) == b:
+            self.reverse_path(b, c)
+        else:
+            self.reverse_path(c, b)
+
+def improve_city(tour: Tour, a: int, neighbours: List[List[int]]) -> List[int]:
+    # apply the first improving move that adds an edge from a to one of its neighbours;
+    # returns the cities whose edges changed, or [] if there is no such move
+    return two_opt_move(tour, a, neighbours) or or_opt_move(tour, a, neighbours)
+
+def two_opt_move(tour: Tour, a: int, neighbours: List[List[int]]) -> List[int]:
+    d = tour.d
+    for succ in (tour.next, tour.prev):
+        # the edge (a, b) is replaced by (a, c), for a neighbour c of a
+        b = succ(a)
+        ab = d(a, b)
+        for c in neighbours[a]:
+            ac = d(a, c)
+            if ac >= ab:
+                break
+            e = succ(c)
+            if c == b or e == a:
+                continue
+            if ab + d(c, e) - ac - d(b, e) > EPSILON:
+                # with succ == prev, the tour runs e, c, ..., b, a in the forward direction
+                tour.move(a, b, c, e)
+                return [a, b, c, e]
+    return []
+
+def or_opt_move(tour: Tour, a: int, neighbours: List[List[int]]) -> List[int]:
+    # move a segment s1..sl that starts at a, in either direction, between c and e
+    d = tour.d
+    n = len(tour.order)
+    for succ, pred in ((tour.next, tour.prev), (tour.prev, tour.next)):
+        s1 = sl = a
+        segment = {a}
+        for _ in range(min(SEGMENT, n - 3)):
+            p, nx = pred(s1), succ(sl)
+            removed = d(p, s1) + d(sl, nx) - d(p, nx)
+            if removed > EPSILON:
+                for end in (s1, sl):
+                    for x in neighbours[end]:
+                        if d(end, x) >= removed:
+                            break
+                        for c, e in ((x, succ(x)), (pred(x), x)):
+                            if c in segment or e in segment or e == p:
+                                continue
+                            edge = d(c, e)
+                            # S reversed (c, sl, ..., s1, e) or in order (c, s1, ..., sl, e)
+                            reversed_gain = removed + edge - d(c, sl) - d(s1, e)
+                            forward_gain = removed + edge - d(c, s1) - d(sl, e)
+                            if max(reversed_gain, forward_gain) > EPSILON:
+                                insert_segment(tour, p, s1, sl, nx, c, e, forward_gain > reversed_gain)
+                                return [p, s1, sl, nx, c, e]
+            sl = succ(sl)
+            if sl in segment:
+                break
+            segment.add(sl)
+    return []
+
+def insert_segment(tour: Tour, p: int, s1: int, sl: int, nx: int, c: int, e: int, forward: bool):
+    # move the segment s1..sl (between p and nx) between c and e, as a sequence of 2-opt moves:
+    # - remove (p, s1), (c, e), add (p, c), (s1, e): p, c, ..., nx, sl, ..., s1, e
+    # - remove (p, c), (nx, sl), add (p, nx), (c, sl): p, nx, ..., c, sl, ..., s1, e
+    # - to keep the orientation, remove (c, sl), (s1, e), add (c, s1), (sl, e)
+    tour.move(p, s1, c, e)
+    if c != nx:
+        tour.move(p, c, nx, sl)
+    if forward and s1 != sl:
+        tour.move(c, sl, s1, e)
+
+def improve(cities: List[City], order: List[int], k: int = NEIGHBOURS, neighbours: List[List[int]] = None,
+            deadline: float = None) -> List[int]:
+    # improve the tour order (indexes into cities) with 2-opt and Or-opt moves until it is
+    # a local optimum, and return the new order. neighbours can be given to reuse the
+    # neighbour lists of the same cities over many tours. with a deadline (a time.time()),
+    # stop there and return the tour improved so far
+    tour = Tour(cities, order)
+    if len(order) < 5:
+        return tour.order
+    if neighbours is None:
+        neighbours = neighbour_lists(cities, k)
+    queue = deque(tour.order)
+    queued = [True] * len(order)  # the don't-look bits are the cities that are not queued
+    steps = 0
+    while queue:
+        steps += 1
+        if deadline is not None and not steps & 255 and time.time() > deadline:
+            break
+        a = queue.popleft()
+        queued[a] = False
+        changed = improve_city(tour, a, neighbours)
+        for c in changed:
+            if not queued[c]:
+                queued[c] = True
+                queue.append(c)
+    return tour.order
+
+def local_search(cities) -> List[City]:
+    # nearest neighbour tour improved with 2-opt and Or-opt to a local optimum
+    tour = nearest_neighbour(cities)
+    return [tour[i] for i in improve(tour, range(len(tour)))]
+
+def benchmark(sizes=(500, 1000, 5000, 20000), two_opt_up_to: int = 500):
+    # tour length and time of local_search, and of two_opt for the smaller instances
+    for n in sizes:
+        algorithms = (local_search, two_opt) if n <= two_opt_up_to else (local_search,)
+        for algorithm in algorithms:
+            time_tsp(algorithm, make_cities(n))
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,157 @@
+import multiprocessing
+import os
+import queue
+import random
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+
+from local_search import improve, neighbour_lists
+from spatial import KDTree
+from tsp import City, make_cities, time_tsp, tour_length
+
+"""
+
+Multi-start local search for the TSP on a pool of processes.
+
+Every worker repeats a restart until the time budget is over: build a randomized
+nearest neighbour tour (from a random start city, sometimes going to the second or
+third nearest city instead of the nearest), and improve it with 2-opt and Or-opt
+(local_search.improve) to a local optimum. Different starts end in different local
+optima, and the best of many is usually a few percent shorter than a single run.
+
+The length of the best tour found by any worker is shared in a multiprocessing.Value.
+A worker only reports a tour to the parent, through a queue, when it beats that length,
+so the parent sees a stream of improvements and keeps the best tour so far.
+
+multi_start(cities) is an algorithm like the ones in tsp.py, e.g.
+
+    plot_tsp(multi_start, make_cities(1000))
+"""
+
+# time budget of multi_start in seconds
+BUDGET = 10.0
+# chance to go to one of the next nearest cities instead of the nearest
+RANDOMNESS = 0.1
+# number of nearest cities to choose from in that case
+CHOICES = 3
+
+# the cities and neighbour lists of a worker process, and the best length and report
+# queue it shares with the parent, set by init_worker
+worker_cities = None
+worker_neighbours = None
+shared_best = None
+improvements = None
+
+def init_worker(cities: List[City], neighbours: List[List[int]], best, reports):
+    global worker_cities, worker_neighbours, shared_best, improvements
+    worker_cities = cities
+    worker_neighbours = neighbours
+    shared_best = best
+    improvements = reports
+
+def randomized_nearest_neighbour(cities: List[City], rng: random.Random) -> List[int]:
+    # nearest neighbour tour (as indexes into cities) from a random start, that sometimes
+    # goes to one of the CHOICES nearest unvisited cities instead of the nearest
+    unvisited = KDTree(cities)
+    current = rng.randrange(len(cities))
+    unvisited.remove(current)
+    order = [current]
+    while len(unvisited):
+        x, y = cities[current]
+        if rng.random() < RANDOMNESS:
+            current = rng.choice(unvisited.nearest_k(x, y, CHOICES))
+        else:
+            current = unvisited.nearest(x, y)
+        unvisited.remove(current)
+        order.append(current)
+    return order
+
+def restarts(worker: int, seed: int, deadline: float) -> int:
+    # restart until the deadline (a time.time()), report the tours that beat the best
+    # tour of all workers; returns the number of restarts. the first restart always
+    # finishes, improved as far as the deadline allows, so there is a tour to report
+    rng = random.Random(seed)
+    count = 0
+    while count == 0 or time.time() < deadline:
+        order = improve(worker_cities, randomized_nearest_neighbour(worker_cities, rng),
+                        neighbours=worker_neighbours, deadline=deadline)
+        count += 1
+        length = tour_length([worker_cities[i] for i in order])
+        with shared_best.get_lock():
+            if length >= shared_best.value:
+                continue
+            shared_best.value = length
+        improvements.put((length, order, worker, count))
+    return count
+
+def multi_start(cities, budget: float = BUDGET, workers: int = None, seed: int = 0,
+                verbose: bool = False) -> List[City]:
+    # best tour of the restarts of all workers within budget seconds
+    length, tour, _ = run_multi_start(cities, budget, workers, seed, verbose)
+    return tour
+
+def run_multi_start(cities, budget: float = BUDGET, workers: int = None, seed: int = 0,
+                    verbose: bool = False) -> Tuple[float, List[City], int]:
+    # multi_start, that also returns the length of the tour and the number of restarts.
+    # the budget includes the neighbour lists and starting the workers. there are at most
+    # as many workers as cpus, more would only share the cpus and each be late for the
+    # deadline with its first restart
+    cities = list(cities)
+    workers = min(workers or os.cpu_count(), os.cpu_count())
+    t0 = time.time()
+    deadline = t0 + budget
+    # the same for every restart, so computed once for all workers
+    neighbours = neighbour_lists(cities)
+    best = multiprocessing.Value('d', float('INF'))
+    reports = multiprocessing.Queue()
+    best_length, best_order = float('INF'), list(range(len(cities)))
+
+    def receive(timeout: float):
+        nonlocal best_length, best_order
+        try:
+            length, order, worker, count = reports.get(timeout=timeout)
+        except queue.Empty:
+            return
+        # the reports of different workers can arrive out of order
+        if length < best_length:
+            best_length, best_order = length, order
+            if verbose:
+                print('{:7.3f} secs: tour length {:.1f} from worker {} restart {}'
+                      .format(time.time() - t0, length, worker, count))
+
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(cities, neighbours, best, reports)) as executor:
+        futures = [executor.submit(restarts, i, seed + i, deadline) for i in range(workers)]
+        while not all(future.done() for future in futures):
+            receive(0.05)
+        total = sum(future.result() for future in futures)
+    # the tours that were put just before the workers stopped
+    while not reports.empty():
+        receive(0.05)
+    if best_length == float('INF'):
+        # no worker reported a tour, e.g. one that failed
+        from local_search import local_search
+        tour = local_search(cities)
+        return tour_length(tour), tour, total
+
+    if verbose:
+        print('{} restarts on {} workers in {:.3f} secs'.format(total, workers, time.time() - t0))
+    return best_length, [cities[i] for i in best_order], total
+
+def benchmark(n: int = 2000, budget: float = 10.0, workers=(1, 2, 4)):
+    # tour length after budget seconds, for different numbers of workers, against one
+    # run of local_search
+    from local_search import local_search
+    cities = make_cities(n)
+    time_tsp(local_search, cities)
+    # run_multi_start uses at most one worker per cpu
+    for w in sorted({min(w, os.cpu_count()) for w in workers}):
+        t0 = time.perf_counter()
+        length, tour, total = run_multi_start(cities, budget, w)
+        t1 = time.perf_counter()
+        print('{} cities: tour length {:.1f} after {} restarts in {:.1f} secs on {} workers for multi_start'
+              .format(len(tour), length, total, t1 - t0, w))
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,135 @@
+import heapq
+
+from typing import List
+
+"""
+
+A k-d tree over cities, for nearest neighbour queries with deletion.
+
+The tree splits the cities at the median x, then each half at the median y, and so on.
+To find the nearest city to a point, search the half the point is in first, and only
+look in the other half when the splitting line is closer than the nearest city found so
+far. That skips most of the tree, so a query takes about log n steps.
+
+Removed cities stay in the tree, but every node counts the cities that are left in its
+subtree, and empty subtrees are skipped. So queries stay fast while the tree empties,
+like in nearest_neighbour, where every visited city is removed.
+"""
+
+class KDTree:
+    def __init__(self, cities: List):
+        # cities is a list of City (anything with x and y); cities are identified by their
+        # index in this list
+        n = len(cities)
+        self.xs = [c.x for c in cities]
+        self.ys = [c.y for c in cities]
+        # node arrays: the city of the node, its children (-1 for none), splitting axis
+        # (0 is x, 1 is y), parent, and the number of cities left in its subtree
+        self.city = [0] * n
+        self.left = [-1] * n
+        self.right = [-1] * n
+        self.axis = [0] * n
+        self.parent = [-1] * n
+        self.count = [0] * n
+        self.alive = [True] * n
+        self.node_of = [0] * n  # city => node
+        self.nodes = 0
+        self.root = self.build(list(range(n)), 0, -1)
+        self.size = n
+
+    def build(self, indexes: List[int], depth: int, parent: int) -> int:
+        # build the subtree for the given cities, returns its node (or -1 for no cities)
+        if not indexes:
+            return -1
+        axis = depth % 2
+        coords = self.xs if axis == 0 else self.ys
+        indexes.sort(key=coords.__getitem__)
+        middle = len(indexes) // 2
+        node = self.nodes
+        self.nodes += 1
+        city = indexes[middle]
+        self.city[node] = city
+        self.axis[node] = axis
+        self.parent[node] = parent
+        self.count[node] = len(indexes)
+        self.node_of[city] = node
+        self.left[node] = self.build(indexes[:middle], depth + 1, node)
+        self.right[node] = self.build(indexes[middle + 1:], depth + 1, node)
+        return node
+
+    def __len__(self) -> int:
+        # number of cities left
+        return self.size
+
+    def remove(self, city: int):
+        # remove city (an index in the list of cities) from the tree
+        node = self.node_of[city]
+        if not self.alive[node]:
+            return
+        self.alive[node] = False
+        self.size -= 1
+        while node >= 0:
+            self.count[node] -= 1
+            node = self.parent[node]
+
+    def nearest(self, x: float, y: float) -> int:
+        # the index of the city left in the tree that is nearest to (x, y), or -1 if the tree is empty
+        xs, ys, city, left, right, axis, count, alive = (
+            self.xs, self.ys, self.city, self.left, self.right, self.axis, self.count, self.alive)
+        best_distance = float('INF')
+        best = -1
+
+        def search(node: int):
+            nonlocal best_distance, best
+            c = city[node]
+            if alive[node]:
+                d = (xs[c] - x) ** 2 + (ys[c] - y) ** 2
+                if d < best_distance:
+                    best_distance, best = d, c
+            diff = x - xs[c] if axis[node] == 0 else y - ys[c]
+            near, far = (left[node], right[node]) if diff < 0 else (right[node], left[node])
+            if near >= 0 and count[near]:
+                search(near)
+            # the other side can only have a nearer city when the splitting line is nearer
+            if far >= 0 and count[far] and diff * diff < best_distance:
+                search(far)
+
+        if self.root >= 0 and count[self.root]:
+            search(self.root)
+        return best
+
+    def nearest_k(self, x: float, y: float, k: int) -> List[int]:
+        # the indexes of the k cities left in the tree that are nearest to (x, y), nearest first
+        xs, ys, city, left, right, axis, count, alive = (
+            self.xs, self.ys, self.city, self.left, self.right, self.axis, self.count, self.alive)
+        heap = []  # max-heap of the k nearest so far, as (-distance, city)
+
+        def search(node: int):
+            c = city[node]
+            if alive[node]:
+                d = (xs[c] - x) ** 2 + (ys[c] - y) ** 2
+                if len(heap) < k:
+                    heapq.heappush(heap, (-d, c))
+                elif d < -heap[0][0]:
+                    heapq.heapreplace(heap, (-d, c))
+            diff = x - xs[c] if axis[node] == 0 else y - ys[c]
+            near, far = (left[node], right[node]) if diff < 0 else (right[node], left[node])
+            if near >= 0 and count[near]:
+                search(near)
+            if far >= 0 and count[far] and (len(heap) < k or diff * diff < -heap[0][0]):
+                search(far)
+
+        if k > 0 and self.root >= 0 and count[self.root]:
+            search(self.root)
+        return [c for _, c in sorted(heap, reverse=True)]
+
+def benchmark(sizes=(1000, 10000, 100000), linear_up_to: int = 1000):
+    # nearest_neighbour with the k-d tree, and the linear search of before for small sizes
+    from tsp import make_cities, nearest_neighbour, nearest_neighbour_linear, time_tsp
+    for n in sizes:
+        algorithms = (nearest_neighbour, nearest_neighbour_linear) if n <= linear_up_to else (nearest_neighbour,)
+        for algorithm in algorithms:
+            time_tsp(algorithm, make_cities(n))
+
+if __name__ == '__main__':
+    benchmark()
@@ -1,10 +1,12 @@
-import matplotlib.pyplot as plt
 import random
 import time
 import itertools
 import math
+import tracemalloc
 from collections import namedtuple
 
+from spatial import KDTree
+
 # based on Peter Norvig's IPython Notebook on the TSP
 
 City = namedtuple('City', 'x y')
@@ -18,13 +20,32 @@ def try_all_tours(cities):
     return min(tours, key=tour_length)
 
 def alltours(cities):
-    # return a list of tours (a list of lists), each tour a permutation of cities,
-    # and each one starting with the same city
+    # generate the tours (lists), each tour a permutation of cities, and each one starting
+    # with the same city; a generator, so the (n-1)! tours are streamed instead of stored
     # note: cities is a set, sets don't support indexing
     start = next(iter(cities)) 
-    return [[start] + list(rest) for rest in itertools.permutations(cities - {start})]
+    return ([start] + list(rest) for rest in itertools.permutations(cities - {start}))
 
 def nearest_neighbour(cities):
+    # start at a city and go to the nearest unvisited city until all cities are visited
+    # the unvisited cities are kept in a k-d tree, so finding the nearest takes about log n
+    cities = list(cities)
+    start = cities[0]
+    unvisited = KDTree(cities)
+    unvisited.remove(0)
+    tour = [start]
+
+    current_city = start
+    while len(unvisited):
+        nearest = unvisited.nearest(current_city.x, current_city.y)
+        unvisited.remove(nearest)
+        current_city = cities[nearest]
+        tour.append(current_city)
+
+    return tour
+
+def nearest_neighbour_linear(cities):
+    # nearest_neighbour with a linear search for the nearest city, O(n^2)
     start = next(iter(cities))
     tour = [start]
 
@@ -83,22 +104,41 @@ def tour_length(tour):
     # the total of distances between each pair of consecutive cities in the tour
     return sum(distance(tour[i], tour[i-1]) for i in range(len(tour)))
 
-def make_cities(n, width=1000, height=1000):
+def make_cities(n, width=1000, height=1000, seed=3):
     # make a set of n cities, each with random coordinates within a rectangle (width x height).
 
-    random.seed(3) # the current system time is used as a seed
-                  # note: if we use the same seed, we get the same set of cities
+    random.seed(seed) # with seed None, the current system time is used as a seed
+                      # note: if we use the same seed, we get the same set of cities
 
     return frozenset(City(random.randrange(width), random.randrange(height)) for c in range(n))
 
 def plot_tour(tour): 
     # plot the cities as circles and the tour as lines between them
+    # pyplot is imported here, so tsp can be used without matplotlib (and its startup time)
+    import matplotlib.pyplot as plt
     points = list(tour) + [tour[0]]
     plt.plot([p.x for p in points], [p.y for p in points], 'bo-') # blue circle markers, solid line style
     plt.axis('scaled') # equal increments of x and y have the same length
     plt.axis('off')
     plt.show()
 
+def time_tsp(algorithm, cities, name=None, memory=False):
+    # apply a TSP algorithm to cities, print the tour length and the time it took (and with
+    # memory the peak memory it allocated), and return the tour. the benchmarks use this
+    if memory:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    tour = algorithm(cities)
+    t1 = time.perf_counter()
+    line = "{:6d} cities: tour length {:.1f} in {:.3f} secs for {}".format(
+        len(tour), tour_length(tour), t1 - t0, name or algorithm.__name__)
+    if memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        line += ", peak memory {:.1f} MB".format(peak / 2 ** 20)
+    print(line)
+    return tour
+
 def plot_tsp(algorithm, cities):
     # apply a TSP algorithm to cities, print the time it took, and plot the resulting tour.
     t0 = time.process_time()
@@ -109,7 +149,8 @@ def plot_tsp(algorithm, cities):
     print("Start plotting ...")
     plot_tour(tour)
 
-# give a demo with 10 cities using brute force
-# plot_tsp(try_all_tours, make_cities(10))
-# plot_tsp(nearest_neighbour, make_cities(500))
-plot_tsp(two_opt, make_cities(500))
\ No newline at end of file
+if __name__ == '__main__':
+    # give a demo with 10 cities using brute force
+    # plot_tsp(try_all_tours, make_cities(10))
+    # plot_tsp(nearest_neighbour, make_cities(500))
+    plot_tsp(two_opt, make_cities(500))
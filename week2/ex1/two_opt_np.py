@@ -0,0 +1,106 @@
+from typing import List, Union
+
+import numpy as np
+
+from local_search import EPSILON
+from tsp import City, make_cities, nearest_neighbour, time_tsp, two_opt
+
+"""
+
+2-opt with NumPy.
+
+A 2-opt move removes two edges (a, b) and (c, d) of the tour and reconnects it as
+(a, c) and (b, d), which reverses the part of the tour from b to c. The tour gets
+shorter by the gain
+
+    d(a, b) + d(c, d) - d(a, c) - d(b, d)
+
+which only takes four distances, so there is no need to build the new tour and compute
+its length. Here the tour is an array of city indexes and the distances are taken from a
+precomputed distance matrix. For a fixed first edge (a, b), the gains of all second
+edges (c, d) are computed at once as one vectorized row, the best one is applied by
+reversing the segment in place, and this is repeated until no move improves the tour.
+
+The matrix takes n * n * 8 bytes, for more than MATRIX_LIMIT cities the distances of a
+row are computed from the coordinates instead.
+"""
+
+MATRIX_LIMIT = 6000
+
+def coordinates(cities: List[City]) -> np.ndarray:
+    # n x 2 array with the x and y of each city
+    return np.array([(c.x, c.y) for c in cities], dtype=float)
+
+def distance_matrix(xy: np.ndarray, block: int = 2 ** 20) -> np.ndarray:
+    # n x n array with the distance between every pair of cities. it is filled a block of
+    # rows (about block distances) at a time, so the matrix is the only n * n array
+    n = len(xy)
+    x, y = xy[:, 0], xy[:, 1]
+    D = np.empty((n, n))
+    rows = max(1, block // max(n, 1))
+    for start in range(0, n, rows):
+        stop = min(start + rows, n)
+        np.hypot(x[start:stop, np.newaxis] - x, y[start:stop, np.newaxis] - y, out=D[start:stop])
+    return D
+
+def pair_distances(xy: np.ndarray, D: Union[np.ndarray, None], p, q) -> np.ndarray:
+    # distances between cities p[k] and q[k] (cities or arrays of cities), from the matrix if there is one
+    if D is not None:
+        return D[p, q]
+    diff = xy[p] - xy[q]
+    return np.hypot(diff[..., 0], diff[..., 1])
+
+def tour_length_np(xy: np.ndarray, order: np.ndarray) -> float:
+    # length of the closed tour visiting the cities in order
+    diff = xy[order] - xy[np.roll(order, -1)]
+    return float(np.hypot(diff[:, 0], diff[:, 1]).sum())
+
+def reverse_segment(order: np.ndarray, i: int, j: int):
+    # reverse order[i+1..j] in place
+    order[i + 1:j + 1] = order[i + 1:j + 1][::-1].copy()
+
+def best_move(xy: np.ndarray, D: Union[np.ndarray, None], order: np.ndarray, i: int):
+    # best second edge (j, j+1) for the first edge (i, i+1), with all gains of the row
+    # computed at once; returns (gain, j), or (0, None) if there is no second edge
+    n = len(order)
+    # the edge (n-1, 0) is next to the edge (0, 1)
+    last = n - 1 if i > 0 else n - 2
+    if last < i + 2:
+        return 0.0, None
+    js = np.arange(i + 2, last + 1)
+    a, b = order[i], order[i + 1]
+    c, d = order[js], order[(js + 1) % n]
+    gains = (pair_distances(xy, D, a, b) + pair_distances(xy, D, c, d)
+             - pair_distances(xy, D, a, c) - pair_distances(xy, D, b, d))
+    k = int(np.argmax(gains))
+    return float(gains[k]), i + 2 + k
+
+def two_opt_order(xy: np.ndarray, order: np.ndarray, D: Union[np.ndarray, None] = None) -> np.ndarray:
+    # improve the tour order in place with 2-opt moves until no move improves it
+    improved = True
+    while improved:
+        improved = False
+        for i in range(len(order) - 2):
+            gain, j = best_move(xy, D, order, i)
+            if gain > EPSILON:
+                reverse_segment(order, i, j)
+                improved = True
+    return order
+
+def two_opt_np(cities) -> List[City]:
+    # nearest neighbour tour improved by 2-opt, like two_opt, but until a local optimum
+    tour = nearest_neighbour(cities)
+    xy = coordinates(tour)
+    D = distance_matrix(xy) if len(tour) <= MATRIX_LIMIT else None
+    order = two_opt_order(xy, np.arange(len(tour)), D)
+    return [tour[k] for k in order]
+
+def benchmark(sizes=(500, 1000, 2000, 5000)):
+    # tour length and time of two_opt_np, and of two_opt for the smaller instances
+    for n in sizes:
+        algorithms = (two_opt_np, two_opt) if n <= 500 else (two_opt_np,)
+        for algorithm in algorithms:
+            time_tsp(algorithm, make_cities(n))
+
+if __name__ == '__main__':
+    benchmark()
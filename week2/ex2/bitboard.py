@@ -0,0 +1,283 @@
+import random
+import time
+
+from typing import List, Union
+
+import othello
+from othello import EMPTY, BLACK, WHITE, OUTER, squares, opponent
+
+"""
+
+A bitboard engine for Othello.
+
+-----------------------------------------------------------------------------
+Board representation
+
+Instead of a list of 100 pieces, the board is stored as two 64-bit integers: one
+for the black pieces and one for the white pieces. Square (m,n) of the list engine
+maps to bit (m-1)*8 + (n-1), so bit 0 is square 11 and bit 63 is square 88:
+
+    bit:  0  1  2  3  4  5  6  7      square: 11 12 13 14 15 16 17 18
+          8  9 10 11 12 13 14 15              21 22 23 24 25 26 27 28
+          ...                                 ...
+         56 57 58 59 60 61 62 63              81 82 83 84 85 86 87 88
+
+Moving all pieces one square in a direction is a single shift of the integer, e.g.
+one row down is `x << 8`. Shifting left or right by one column would wrap pieces
+from one row into the next, so those shifts are masked with a file mask. This way
+legal moves and flips are found for all squares at once with a handful of shifts,
+instead of walking every square in every direction.
+
+The functions below have the same names and signatures as the list engine in
+othello.py (legal_moves, make_move, score, ...), and moves are still the squares
+11..88. A BitBoard can also be indexed as `board[square]` like a list board, so the
+strategies and heuristics of othello.py keep working on it.
+"""
+
+FULL = 0xFFFFFFFFFFFFFFFF
+# all bits except the first (A) or the last (H) column
+NOT_A_FILE = 0xFEFEFEFEFEFEFEFE
+NOT_H_FILE = 0x7F7F7F7F7F7F7F7F
+
+# shift per direction as (left shift, right shift, mask), in the same order as
+# othello.DIRECTIONS: UP, UP_RIGHT, RIGHT, DOWN_RIGHT, DOWN, DOWN_LEFT, LEFT, UP_LEFT
+SHIFTS = (
+    (0, 8, FULL),
+    (0, 7, NOT_A_FILE),
+    (1, 0, NOT_A_FILE),
+    (9, 0, NOT_A_FILE),
+    (8, 0, FULL),
+    (7, 0, NOT_H_FILE),
+    (0, 1, NOT_H_FILE),
+    (0, 9, NOT_H_FILE),
+)
+
+# conversion between squares 11..88 and bit indexes 0..63
+SQUARE_TO_BIT = {sq: (sq // 10 - 1) * 8 + (sq % 10 - 1) for sq in squares()}
+BIT_TO_SQUARE = [sq for sq in squares()]
+
+class BitBoard:
+    # an Othello board as two 64-bit integers, one bit per square per player
+    __slots__ = ('black', 'white')
+
+    def __init__(self, black: int = 0, white: int = 0):
+        self.black = black
+        self.white = white
+
+    def copy(self) -> 'BitBoard':
+        return BitBoard(self.black, self.white)
+
+    def __getitem__(self, square: Union[int, slice]) -> Union[str, List[str]]:
+        # board[square] gives the piece on square, just like a list board
+        # a slice gives the pieces of the equivalent list board, so board[:] is a list board
+        if isinstance(square, slice):
+            return to_list(self)[square]
+        bit_index = SQUARE_TO_BIT.get(square)
+        if bit_index is None:
+            return OUTER
+        bit = 1 << bit_index
+        if self.black & bit:
+            return BLACK
+        if self.white & bit:
+            return WHITE
+        return EMPTY
+
+    def __setitem__(self, square: int, piece: str):
+        # board[square] = piece, so the list engine can also make moves on a BitBoard
+        bit = 1 << SQUARE_TO_BIT[square]
+        self.black &= ~bit
+        self.white &= ~bit
+        if piece == BLACK:
+            self.black |= bit
+        elif piece == WHITE:
+            self.white |= bit
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, BitBoard) and self.black == other.black and self.white == other.white
+
+    def __hash__(self) -> int:
+        return hash((self.black, self.white))
+
+    def __repr__(self) -> str:
+        return 'BitBoard(0x%016x, 0x%016x)' % (self.black, self.white)
+
+def initial_board() -> BitBoard:
+    # create a new board with the initial black and white positions filled
+    return from_list(othello.initial_board())
+
+def from_list(board: List[str]) -> BitBoard:
+    # convert a list board of othello.py into a BitBoard
+    black = white = 0
+    for sq, bit_index in SQUARE_TO_BIT.items():
+        if board[sq] == BLACK:
+            black |= 1 << bit_index
+        elif board[sq] == WHITE:
+            white |= 1 << bit_index
+    return BitBoard(black, white)
+
+def to_list(board: BitBoard) -> List[str]:
+    # convert a BitBoard into a list board of othello.py
+    rep = [OUTER] * 100
+    for sq, bit_index in SQUARE_TO_BIT.items():
+        bit = 1 << bit_index
+        rep[sq] = BLACK if board.black & bit else WHITE if board.white & bit else EMPTY
+    return rep
+
+def bits_to_squares(bits: int) -> List[int]:
+    # list the squares of all set bits, in ascending order (like squares())
+    result = []
+    while bits:
+        lowest = bits & -bits
+        result.append(BIT_TO_SQUARE[lowest.bit_length() - 1])
+        bits ^= lowest
+    return result
+
+def move_mask(own: int, opp: int) -> int:
+    # bits of all empty squares where own can move, i.e. that bracket a line of opp pieces
+    empty = ~(own | opp) & FULL
+    moves = 0
+    for left, right, mask in SHIFTS:
+        # walk from own pieces over up to 6 opp pieces in this direction
+        x = ((own << left) >> right) & mask & opp
+        for _ in range(5):
+            x |= ((x << left) >> right) & mask & opp
+        moves |= ((x << left) >> right) & mask & empty
+    return moves
+
+def flip_mask(bit: int, own: int, opp: int) -> int:
+    # bits of the opp pieces that are flipped when own moves on bit
+    flips = 0
+    for left, right, mask in SHIFTS:
+        line = 0
+        x = ((bit << left) >> right) & mask
+        while x & opp:
+            line |= x
+            x = ((x << left) >> right) & mask
+        # the line is only flipped when it is closed by an own piece
+        if x & own:
+            flips |= line
+    return flips
+
+def own_and_opp(player: str, board: BitBoard):
+    # the pieces of player and of the opponent
+    if player == BLACK:
+        return board.black, board.white
+    return board.white, board.black
+
+def is_valid(move: int) -> bool:
+    # is move a square on the board?
+    return move in SQUARE_TO_BIT
+
+def is_legal(move: int, player: str, board: BitBoard) -> bool:
+    # is this a legal move for the player?
+    own, opp = own_and_opp(player, board)
+    return bool(move_mask(own, opp) & (1 << SQUARE_TO_BIT[move]))
+
+def legal_moves(player: str, board: BitBoard) -> List[int]:
+    # get a list of all legal moves for player, ordered like othello.legal_moves
+    own, opp = own_and_opp(player, board)
+    return bits_to_squares(move_mask(own, opp))
+
+def any_legal_move(player: str, board: BitBoard) -> bool:
+    # can player make any moves?
+    own, opp = own_and_opp(player, board)
+    return move_mask(own, opp) != 0
+
+def make_move(move: int, player: str, board: BitBoard) -> BitBoard:
+    # place a piece of player on move and flip all the bracketed pieces, in place
+    bit = 1 << SQUARE_TO_BIT[move]
+    own, opp = own_and_opp(player, board)
+    flips = flip_mask(bit, own, opp)
+    own |= bit | flips
+    opp &= ~flips
+    if player == BLACK:
+        board.black, board.white = own, opp
+    else:
+        board.white, board.black = own, opp
+    return board
+
+def next_player(board: BitBoard, prev_player: str) -> Union[str, None]:
+    # which player should move next?  Returns None if no legal moves exist
+    other_player = opponent(prev_player)
+    if any_legal_move(other_player, board):
+        return other_player
+    elif any_legal_move(prev_player, board):
+        return prev_player
+    return None
+
+def score(player: str, board: BitBoard) -> int:
+    # compute player's score (number of player's pieces minus opponent's)
+    own, opp = own_and_opp(player, board)
+    return bin(own).count('1') - bin(opp).count('1')
+
+def random_strategy(player: str, board: BitBoard) -> int:
+    return random.choice(legal_moves(player, board))
+
+# -----------------------------------------------------------------------------
+# Testing and benchmarking
+
+def test(games: int = 200):
+    # play random games on both engines side by side and check that they agree
+    # on the legal moves, the board after every move and the final score
+    rng = random.Random(1)
+    for _ in range(games):
+        board = othello.initial_board()
+        bitboard = initial_board()
+        player = BLACK
+        while player is not None:
+            moves = othello.legal_moves(player, board)
+            assert legal_moves(player, bitboard) == moves
+            for sq in squares():
+                assert is_legal(sq, player, bitboard) == othello.is_legal(sq, player, board)
+            move = rng.choice(moves)
+            othello.make_move(move, player, board)
+            make_move(move, player, bitboard)
+            assert to_list(bitboard) == board
+            assert from_list(board) == bitboard
+            assert score(BLACK, bitboard) == othello.score(BLACK, board)
+            prev_player, player = player, othello.next_player(board, player)
+            assert next_player(bitboard, prev_player) == player
+        assert next_player(bitboard, BLACK) is None and next_player(bitboard, WHITE) is None
+        assert score(WHITE, bitboard) == othello.score(WHITE, board)
+
+    # the list engine and the list strategies also work on a BitBoard
+    bitboard = initial_board()
+    for sq in squares():
+        assert bitboard[sq] == othello.initial_board()[sq]
+    assert bitboard[:] == othello.initial_board()
+    othello.make_move(34, BLACK, bitboard)
+    assert bitboard == make_move(34, BLACK, initial_board())
+    assert othello.heuristic_othello(WHITE, bitboard) == othello.heuristic_othello(WHITE, to_list(bitboard))
+    print('bitboard: %d random games agree with the list engine' % games)
+
+def perft(player: str, board, depth: int, engine) -> int:
+    # count the nodes of the full game tree up to depth, using the given engine module
+    if depth == 0:
+        return 1
+    moves = engine.legal_moves(player, board)
+    if not moves:
+        if not engine.any_legal_move(opponent(player), board):
+            return 1
+        return 1 + perft(opponent(player), board, depth - 1, engine)
+    nodes = 1
+    for move in moves:
+        child = board.copy() if isinstance(board, BitBoard) else board[:]
+        engine.make_move(move, player, child)
+        nodes += perft(opponent(player), child, depth - 1, engine)
+    return nodes
+
+def benchmark(depth: int = 5):
+    # nodes per second of a full tree walk from the initial position for both engines
+    import sys
+    engines = (('list', othello, othello.initial_board()),
+               ('bitboard', sys.modules[__name__], initial_board()))
+    for name, engine, board in engines:
+        t0 = time.perf_counter()
+        nodes = perft(BLACK, board, depth, engine)
+        t1 = time.perf_counter()
+        print('{:>8}: {} nodes at depth {} in {:.3f} secs, {:.0f} nodes/sec'
+              .format(name, nodes, depth, t1 - t0, nodes / (t1 - t0)))
+
+if __name__ == '__main__':
+    test()
+    benchmark()
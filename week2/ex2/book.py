@@ -0,0 +1,179 @@
+import argparse
+import mmap
+import os
+import random
+import struct
+import warnings
+
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Union
+
+import othello
+from othello import BLACK, initial_board, get_move, make_move, next_player, score, is_legal, legal_moves, zobrist_hash
+
+"""
+
+Opening book for Othello.
+
+The book is built offline from self-play: a strategy plays many games against itself,
+with some random moves in the opening for variety. For every position in the first
+plies of these games, the book keeps the move with the best mean final score for the
+player that made it.
+
+    python book.py --strategy timed_0.1s --games 1000 --plies 10 --output opening_book.bin
+
+On disk the book is a sorted array of 9-byte records: the Zobrist hash of the position
+(with the player to move) and the move. The file is memory-mapped on load and searched
+with a binary search, so opening a book of any size is instant and costs no memory until
+positions are looked up.
+
+book_strategy(strategy) plays the book move when the position is in the book, and asks
+strategy otherwise.
+"""
+
+RECORD = struct.Struct('<QB')  # key, move
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'opening_book.bin')
+
+def position_key(player: str, board: List[str]) -> int:
+    # the position as seen by player, the player to move
+    return zobrist_hash(player, player, board)
+
+# -----------------------------------------------------------------------------
+# Building
+
+def self_play_game(strategy: str, plies: int, randomness: float, seed: int) -> Tuple[List[Tuple[int, int, str]], int]:
+    # play strategy against itself, where each of the first plies moves is random with
+    # probability randomness; returns (key, move, player) for the first plies moves and
+    # the final score for black
+    from tournament import STRATEGIES
+    rng = random.Random(seed)
+    random.seed(seed)
+    othello.TRANSPOSITION_TABLE.clear()
+
+    board, player = initial_board(), BLACK
+    positions = []
+    while player is not None:
+        if len(positions) < plies and rng.random() < randomness:
+            move = rng.choice(legal_moves(player, board))
+        else:
+            move = get_move(STRATEGIES[strategy], player, board)
+        if len(positions) < plies:
+            positions.append((position_key(player, board), move, player))
+        make_move(move, player, board)
+        player = next_player(board, player)
+
+    return positions, score(BLACK, board)
+
+def build_book(
+     strategy: str = 'timed_0.1s',
+     games: int = 1000,
+     plies: int = 10,
+     randomness: float = 0.2,
+     min_games: int = 2,
+     workers: int = None,
+     seed: int = 0
+) -> Dict[int, int]:
+    # play the self-play games in parallel and choose the book move for every position
+    # that was played at least min_games times
+    results = defaultdict(lambda: defaultdict(list))  # key => move => final scores for the mover
+    with ProcessPoolExecutor(workers or os.cpu_count()) as executor:
+        seeds = [seed + i for i in range(games)]
+        for positions, black_score in executor.map(self_play_game, [strategy] * games, [plies] * games,
+                                                   [randomness] * games, seeds):
+            for key, move, player in positions:
+                results[key][move].append(black_score if player == BLACK else -black_score)
+
+    book = {}
+    for key, moves in results.items():
+        played = {move: sum(scores) / len(scores) for move, scores in moves.items() if len(scores) >= min_games}
+        if played:
+            book[key] = max(played, key=played.get)
+    return book
+
+def write_book(book: Dict[int, int], path: str = DEFAULT_PATH):
+    # write the book as records sorted by key
+    with open(path, 'wb') as f:
+        for key in sorted(book):
+            f.write(RECORD.pack(key, book[key]))
+
+# -----------------------------------------------------------------------------
+# Using
+
+class OpeningBook:
+    # a book file, memory-mapped and searched in place
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        # an empty file can't be memory-mapped, but is a valid (empty) book
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self.size = size // RECORD.size
+
+    def __len__(self) -> int:
+        return self.size
+
+    def close(self):
+        if self.size:
+            self.data.close()
+        self.file.close()
+
+    def find(self, key: int) -> Union[int, None]:
+        # binary search for key, returns its move or None
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            middle_key, move = RECORD.unpack_from(self.data, middle * RECORD.size)
+            if middle_key < key:
+                low = middle + 1
+            elif middle_key > key:
+                high = middle
+            else:
+                return move
+        return None
+
+    def lookup(self, player: str, board: List[str]) -> Union[int, None]:
+        # the book move for player, or None when the position isn't in the book
+        move = self.find(position_key(player, board))
+        # a hash collision could give a move that isn't legal here
+        if move is not None and is_legal(move, player, board):
+            return move
+        return None
+
+def book_strategy(strategy, path: str = DEFAULT_PATH):
+    # make a strategy that plays the book move if there is one, and plays like strategy
+    # otherwise. the book is opened on the first move, so in the process that plays.
+    # without a book file (it isn't built yet), it warns once and plays like strategy
+    book = None
+    def strategy_with_book(player: str, board: List[str]) -> int:
+        nonlocal book
+        if book is None:
+            try:
+                book = OpeningBook(path)
+            except FileNotFoundError:
+                warnings.warn('no opening book at {}, build it with book.py; playing without it'.format(path))
+                book = False
+        move = book.lookup(player, board) if book else None
+        return move if move is not None else strategy(player, board)
+    strategy_with_book.__name__ = '%s_book' % strategy.__name__
+    return strategy_with_book
+
+def main(args: List[str] = None):
+    from tournament import STRATEGIES
+    parser = argparse.ArgumentParser(description='Build an Othello opening book from self-play.')
+    parser.add_argument('--strategy', choices=STRATEGIES, default='timed_0.1s', help='the strategy that plays itself')
+    parser.add_argument('-n', '--games', type=int, default=1000)
+    parser.add_argument('--plies', type=int, default=10, help='number of opening moves per game in the book')
+    parser.add_argument('--randomness', type=float, default=0.2, help='chance of a random move in the opening')
+    parser.add_argument('--min-games', type=int, default=2, help='minimal number of games for a book move')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='self-play games at once, one per process (default: one per core)')
+    parser.add_argument('-s', '--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', default=DEFAULT_PATH)
+    options = parser.parse_args(args)
+
+    book = build_book(options.strategy, options.games, options.plies, options.randomness, options.min_games,
+                      options.workers, options.seed)
+    write_book(book, options.output)
+    print('{} positions written to {}'.format(len(book), options.output))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+import random
+import time
+
+from typing import List
+
+from othello import EMPTY, BLACK, Move, SearchStats, count_empty, initial_board, make_move, legal_moves, next_player
+from bitboard import BIT_TO_SQUARE, from_list, move_mask, flip_mask
+
+"""
+
+Exact endgame solver for Othello.
+
+With few empty squares left the whole game tree can be searched, so instead of
+heuristic_othello the leaves are scored by the final disc count, score(player, board),
+and the result is the perfect move. The search is a negamax alpha-beta on the bitboard
+engine, with its own move ordering: fastest first, i.e. the moves that leave the
+opponent the fewest replies are searched first. These tend to be the best moves, and
+they have the smallest subtrees.
+
+endgame_strategy(strategy) plays like strategy until there are EMPTIES_EXACT or fewer
+empty squares, and plays the solved move from then on.
+"""
+
+# number of empty squares from which the endgame is solved exactly
+EMPTIES_EXACT = 10
+
+def count(bits: int) -> int:
+    return bin(bits).count('1')
+
+def negamax(own: int, opp: int, alpha: int, beta: int, stats: SearchStats) -> int:
+    # final disc difference for the player to move (own), with perfect play by both
+    stats.nodes += 1
+    moves = move_mask(own, opp)
+    if not moves:
+        # pass, or the game is over when the opponent can't move either
+        if not move_mask(opp, own):
+            return count(own) - count(opp)
+        return -negamax(opp, own, -beta, -alpha, stats)
+
+    best = -64
+    for _, child_own, child_opp, _ in ordered_children(own, opp, moves):
+        value = -negamax(child_opp, child_own, -beta, -alpha, stats)
+        if value > best:
+            best = value
+            if value > alpha:
+                alpha = value
+                if alpha >= beta:
+                    break
+    return best
+
+def ordered_children(own: int, opp: int, moves: int):
+    # the positions after each move, as (opponent mobility, own, opp, bit), fastest first
+    children = []
+    while moves:
+        bit = moves & -moves
+        moves ^= bit
+        flips = flip_mask(bit, own, opp)
+        child_own = own | bit | flips
+        child_opp = opp & ~flips
+        children.append((count(move_mask(child_opp, child_own)), child_own, child_opp, bit))
+    children.sort(key=lambda child: child[0])
+    return children
+
+def solve_endgame(player: str, board: List[str], stats: SearchStats = None) -> Move:
+    # the perfect move for player on a list board (or BitBoard), with the final score it gives
+    if stats is None:
+        stats = SearchStats()
+    bitboard = from_list(board)
+    own, opp = (bitboard.black, bitboard.white) if player == BLACK else (bitboard.white, bitboard.black)
+
+    best = Move(None, -65)
+    alpha = -64
+    for _, child_own, child_opp, bit in ordered_children(own, opp, move_mask(own, opp)):
+        value = -negamax(child_opp, child_own, -64, -alpha, stats)
+        if value > best.score:
+            best = Move(BIT_TO_SQUARE[bit.bit_length() - 1], value)
+            alpha = max(alpha, value)
+    return best
+
+def endgame_strategy(strategy, empties: int = EMPTIES_EXACT):
+    # make a strategy that plays like strategy, and solves the game once there are
+    # empties or fewer empty squares
+    def strategy_with_endgame(player: str, board: List[str]) -> int:
+        if count_empty(board) <= empties:
+            return solve_endgame(player, board).move
+        return strategy(player, board)
+    strategy_with_endgame.__name__ = '%s_endgame' % strategy.__name__
+    return strategy_with_endgame
+
+def benchmark(empties=range(6, 15, 2), seed: int = 3):
+    # time to solve positions with a given number of empty squares, reached by random play
+    rng = random.Random(seed)
+    for n in empties:
+        board, player = initial_board(), BLACK
+        while board.count(EMPTY) > n:
+            make_move(rng.choice(legal_moves(player, board)), player, board)
+            player = next_player(board, player)
+            if player is None:
+                board, player = initial_board(), BLACK
+        stats = SearchStats()
+        t0 = time.perf_counter()
+        best = solve_endgame(player, board, stats)
+        t1 = time.perf_counter()
+        print('{:2d} empties: move {} final score {:+3d} in {} nodes, {:.3f} secs'
+              .format(n, best.move, best.score, stats.nodes, t1 - t0))
+
+if __name__ == '__main__':
+    benchmark()
@@ -1,7 +1,8 @@
 import random
 random.seed(3)
+import time
 
-from collections import namedtuple
+from collections import defaultdict, namedtuple
 from typing import List, Tuple, Union
 
 """
@@ -56,6 +57,9 @@ def squares() -> List[int]:
     # 11 means first row, first col, because the board size is 10x10
     return [i for i in range(11, 89) if 1 <= (i % 10) <= 8]
 
+# the valid squares computed once, for the functions that run at every node of a search
+SQUARES = tuple(squares())
+
 def initial_board() -> List[str]:
     # create a new board with the initial black and white positions filled
     # returns a list ['?', '?', '?', ..., '?', '?', '?', '.', '.', '.', ...]
@@ -91,11 +95,11 @@ def print_board(board: List[str]) -> str:
 def is_valid(move: int) -> bool:
     # is move a square on the board?
     # move must be an int, and must refer to a real square
-    return move in squares()
+    return move in SQUARES
 
 def opponent(player: str) -> str:
     # get player's opponent piece
-    return BLACK if player is WHITE else WHITE
+    return BLACK if player == WHITE else WHITE
 
 def find_bracket(square: int, player: str, board: List[str], direction: int) -> Union[int, None]:
     # find and return the square that forms a bracket with square for player in the given
@@ -125,6 +129,36 @@ def make_move(move: int, player: str, board: List[str]) -> List[str]:
         make_flips(move, player, board, d)
     return board
 
+def make_move_undo(move: int, player: str, board: List[str], undo: List[Tuple[int, List[int]]], evaluator=None) -> None:
+    # make the move in place, like make_move, and push the move with the flipped squares
+    # on the undo stack, so unmake_move can restore the board without copying it
+    # an IncrementalEvaluator (or any heuristic with make and unmake) is told about the move
+    board[move] = player
+    flips = []
+    for d in DIRECTIONS:
+        bracket = find_bracket(move, player, board, d)
+        if not bracket:
+            continue
+        square = move + d
+        while square != bracket:
+            board[square] = player
+            flips.append(square)
+            square += d
+    undo.append((move, flips))
+    if hasattr(evaluator, 'make'):
+        evaluator.make(player, move, flips)
+
+def unmake_move(board: List[str], undo: List[Tuple[int, List[int]]], evaluator=None) -> None:
+    # take back the last move on the undo stack: empty its square and flip its flips back
+    move, flips = undo.pop()
+    player = board[move]
+    opp = opponent(player)
+    board[move] = EMPTY
+    for square in flips:
+        board[square] = opp
+    if hasattr(evaluator, 'unmake'):
+        evaluator.unmake(player, move, flips)
+
 def make_flips(move: int, player: str, board: List[str], direction: int) -> None:
     # flip pieces in the given direction as a result of the move by player
     bracket = find_bracket(move, player, board, direction)
@@ -151,21 +185,23 @@ class IllegalMoveError(Exception):
 def legal_moves(player: str, board: List[str]) -> List[int]:
     # get a list of all legal moves for player
     # legal means: move must be an empty square and there has to be is an occupied line in some direction
-    return [sq for sq in squares() if is_legal(sq, player, board)]
+    return [sq for sq in SQUARES if is_legal(sq, player, board)]
 
 def any_legal_move(player: str, board: List[str]) -> bool:
     # can player make any moves?
-    return any(is_legal(sq, player, board) for sq in squares())
+    return any(is_legal(sq, player, board) for sq in SQUARES)
 
 # Putting it all together. Each round consists of:
 # - Get a move from the current player.
 # - Apply it to the board.
 # - Switch players. If the game is over, get the final score.
 
-def play(black_strategy, white_strategy) -> Tuple[List[str], int]:
+def play(black_strategy, white_strategy, verbose: bool = True) -> Tuple[List[str], int]:
     # play a game of Othello and return the final board and score
+    # the board is printed after every move, unless verbose is False
     board = initial_board()
-    print(print_board(board))
+    if verbose:
+        print(print_board(board))
 
     # starting player
     player = BLACK
@@ -175,7 +211,8 @@ def play(black_strategy, white_strategy) -> Tuple[List[str], int]:
         move = get_move(strategy, player, board)
         make_move(move, player, board)
         player = next_player(board, player)
-        print(print_board(board))
+        if verbose:
+            print(print_board(board))
 
     return board, score(BLACK, board)
 
@@ -205,7 +242,7 @@ def score(player: str, board: List[str]) -> int:
     score = other_score = 0
     other_player = opponent(player)
 
-    for square in squares():
+    for square in SQUARES:
         piece = board[square]
         if piece == player:
             score += 1
@@ -214,40 +251,247 @@ def score(player: str, board: List[str]) -> int:
     
     return score - other_score
 
+def count_empty(board: List[str]) -> int:
+    # number of empty squares, through board[square] so it works for a BitBoard too
+    return sum(board[square] == EMPTY for square in SQUARES)
+
 # Play strategies
 
 def random_strategy(player: str, board: List[str]) -> int:
     return random.choice(legal_moves(player, board))
 
-def heuristic_othello(player: str, board: List[str]) -> int:
-    board_weights = [
-        0,   0,   0,   0,   0,   0,   0,   0,   0,   0,
-        0, 120, -20,  20,   5,   5,  20, -20, 120,   0,
-        0, -20, -40,  -5,  -5,  -5,  -5, -40, -20,   0,
-        0,  20,  -5,  15,   3,   3,  15,  -5,  20,   0,
-        0,   5,  -5,   3,   3,   3,   3,  -5,   5,   0,
-        0,   5,  -5,   3,   3,   3,   3,  -5,   5,   0,
-        0,  20,  -5,  15,   3,   3,  15,  -5,  20,   0,
-        0, -20, -40,  -5,  -5,  -5,  -5, -40, -20,   0,
-        0, 120, -20,  20,   5,   5,  20, -20, 120,   0,
-        0,   0,   0,   0,   0,   0,   0,   0,   0,   0,
-    ]
+BOARD_WEIGHTS = (
+    0,   0,   0,   0,   0,   0,   0,   0,   0,   0,
+    0, 120, -20,  20,   5,   5,  20, -20, 120,   0,
+    0, -20, -40,  -5,  -5,  -5,  -5, -40, -20,   0,
+    0,  20,  -5,  15,   3,   3,  15,  -5,  20,   0,
+    0,   5,  -5,   3,   3,   3,   3,  -5,   5,   0,
+    0,   5,  -5,   3,   3,   3,   3,  -5,   5,   0,
+    0,  20,  -5,  15,   3,   3,  15,  -5,  20,   0,
+    0, -20, -40,  -5,  -5,  -5,  -5, -40, -20,   0,
+    0, 120, -20,  20,   5,   5,  20, -20, 120,   0,
+    0,   0,   0,   0,   0,   0,   0,   0,   0,   0,
+)
 
+def heuristic_othello(player: str, board: List[str]) -> int:
     score = 0
     other_player = opponent(player)
 
-    for square in squares():
+    for square in SQUARES:
         if board[square] == player:
-            score += board_weights[square]
+            score += BOARD_WEIGHTS[square]
         elif board[square] == other_player:
-            score -= board_weights[square]
+            score -= BOARD_WEIGHTS[square]
         
     return score
 
+class IncrementalEvaluator:
+    # heuristic_othello as a running score, so evaluating a leaf is O(1).
+    # the search reports every move and undo with make/unmake, which add or subtract
+    # the weight of the new piece and twice the weight of every flipped square (that
+    # goes from the opponent to the player). create it for the root board of the search,
+    # and use it as heuristic: evaluator(player, board) == heuristic_othello(player, board)
+    def __init__(self, board: List[str]):
+        # score for black
+        self.value = heuristic_othello(BLACK, board)
+
+    def make(self, player: str, move: int, flips: List[int]):
+        delta = BOARD_WEIGHTS[move]
+        for square in flips:
+            delta += 2 * BOARD_WEIGHTS[square]
+        self.value += delta if player == BLACK else -delta
+
+    def unmake(self, player: str, move: int, flips: List[int]):
+        self.make(opponent(player), move, flips)
+
+    def __call__(self, player: str, board: List[str]) -> int:
+        return self.value if player == BLACK else -self.value
+
+# Transposition table
+
+# The same position is often reached by different move orders. A transposition table
+# remembers the result of a search per position, so it doesn't have to be searched again.
+# Positions are identified by their Zobrist hash: a random 64-bit number for every
+# (square, piece), xor-ed together for all pieces on the board. Making a move only
+# changes a few squares, so the hash of a child follows from its parent with a few xors.
+
+zobrist_random = random.Random(2021)  # own generator, so the game's random.seed(3) is unaffected
+ZOBRIST = {piece: [zobrist_random.getrandbits(64) for _ in range(100)] for piece in (BLACK, WHITE)}
+# xor-ing a flip key changes the piece on a square from one player to the other
+ZOBRIST_FLIP = [b ^ w for b, w in zip(ZOBRIST[BLACK], ZOBRIST[WHITE])]
+# keys for white to move, and for white being the player the scores are computed for
+ZOBRIST_TURN = zobrist_random.getrandbits(64)
+ZOBRIST_PLAYER = zobrist_random.getrandbits(64)
+
+# bound types: the stored score is the exact value, or a lower or upper bound of it
+EXACT, LOWER, UPPER = 0, 1, 2
+
+Entry = namedtuple('Entry', 'key depth bound move score generation')
+
+def zobrist_hash(player: str, turn: str, board: List[str]) -> int:
+    # hash of the pieces on the board, the player to move and the player that is scored
+    key = 0
+    for square in SQUARES:
+        piece = board[square]
+        if piece in ZOBRIST:
+            key ^= ZOBRIST[piece][square]
+    if turn == WHITE:
+        key ^= ZOBRIST_TURN
+    if player == WHITE:
+        key ^= ZOBRIST_PLAYER
+    return key
+
+class TranspositionTable:
+    # a fixed number of slots, a position is stored in slot hash % size.
+    # replacement policy: an entry of the running search is only replaced by the same
+    # position or by a search that is at least as deep, entries of previous searches
+    # (see new_search) are always replaced.
+    def __init__(self, size: int = 2 ** 18):
+        self.size = size
+        self.slots = [None] * size
+        self.generation = 0
+        # statistics, to tune the size
+        self.hits = 0        # probes that found the position
+        self.misses = 0      # probes that didn't
+        self.stores = 0      # entries written
+        self.overwrites = 0  # entries of another position that were replaced
+
+    def new_search(self):
+        # mark all current entries as old, so they give way to the next search
+        self.generation += 1
+
+    def probe(self, key: int) -> Union[Entry, None]:
+        entry = self.slots[key % self.size]
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def store(self, key: int, depth: int, bound: int, move: int, score: float):
+        index = key % self.size
+        old = self.slots[index]
+        if old is not None and old.key != key:
+            if old.generation == self.generation and old.depth > depth:
+                return
+            self.overwrites += 1
+        self.slots[index] = Entry(key, depth, bound, move, score, self.generation)
+        self.stores += 1
+
+    def clear(self):
+        self.slots = [None] * self.size
+        self.hits = self.misses = self.stores = self.overwrites = 0
+
+    def __str__(self):
+        used = sum(entry is not None for entry in self.slots)
+        return '%d/%d slots used, %d hits, %d misses, %d stores, %d overwrites' % (
+            used, self.size, self.hits, self.misses, self.stores, self.overwrites)
+
+# Move ordering
+
+# alpha beta prunes the most when the best move is searched first. legal_moves gives the
+# moves in square order, so MoveOrdering sorts them first. The orderings can be combined,
+# in order of priority:
+# - killers: moves that caused a cutoff at the same ply elsewhere in the tree
+# - corners: corners first
+# - history: moves that caused cutoffs anywhere, weighted by depth * depth
+# - weights: by BOARD_WEIGHTS
+# the move of the transposition table or principal variation always goes first.
+
+CORNERS = (11, 18, 81, 88)
+
+class MoveOrdering:
+    def __init__(self, corners: bool = True, weights: bool = True, history: bool = True, killers: bool = True):
+        self.corners = corners
+        self.weights = weights
+        self.history = history
+        self.killers = killers
+        self.reset()
+
+    def reset(self):
+        # forget the history and killers, e.g. for a new game
+        self.history_table = {BLACK: [0] * 100, WHITE: [0] * 100}
+        self.killer_moves = defaultdict(list)  # ply => up to 2 moves, last cutoff first
+
+    def order(self, moves: List[int], turn: str, ply: int) -> List[int]:
+        killers = self.killer_moves[ply] if self.killers else ()
+        history = self.history_table[turn]
+        def priority(move: int):
+            return (move in killers,
+                    self.corners and move in CORNERS,
+                    history[move] if self.history else 0,
+                    BOARD_WEIGHTS[move] if self.weights else 0)
+        return sorted(moves, key=priority, reverse=True)
+
+    def cutoff(self, move: int, turn: str, depth: int, ply: int):
+        # move caused a cutoff for turn, with depth left to search
+        if self.history:
+            self.history_table[turn][move] += depth * depth
+        if self.killers:
+            killers = self.killer_moves[ply]
+            if move not in killers:
+                killers.insert(0, move)
+                del killers[2:]
+
+    def __str__(self):
+        names = [name for name in ('killers', 'corners', 'history', 'weights') if getattr(self, name)]
+        return ', '.join(names) or 'square order'
+
 def maximizing(player: str, turn: str):
     return player == turn
 
-def minimax(player: str, turn: str, board: List[str], depth: int, heuristic) -> Move:
+class SearchStats:
+    # counters of a search, shared by all nodes of the search tree
+    def __init__(self):
+        self.nodes = 0
+        self.depth = 0  # deepest completed iteration of iterative_deepening
+        # for minimax_ab: nodes whose moves were searched, and how many of those were cut
+        # off by alpha beta pruning, after how many moves
+        self.expanded = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.moves_searched = 0
+
+    def cutoff_rate(self) -> float:
+        # fraction of expanded nodes that were cut off
+        return self.cutoffs / self.expanded if self.expanded else 0.0
+
+    def first_move_rate(self) -> float:
+        # fraction of the cutoffs that happened on the first move, 1.0 is perfect ordering
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    def branching_factor(self) -> float:
+        # mean number of moves searched per expanded node
+        return self.moves_searched / self.expanded if self.expanded else 0.0
+
+    def effective_branching_factor(self, depth: int, searches: int = 1) -> float:
+        # b such that a uniform tree of the depth with b children per node has as many
+        # nodes as one of the searches
+        return (self.nodes / searches) ** (1 / depth)
+
+    def __str__(self):
+        return '%d nodes, depth %d' % (self.nodes, self.depth)
+
+class SearchTimeout(Exception):
+    # raised inside minimax_ab when the deadline has passed, to abort the search
+    pass
+
+def minimax(
+     player: str,
+     turn: str,
+     board: List[str],
+     depth: int,
+     heuristic,
+     undo: List[Tuple[int, List[int]]] = None,
+     stats: SearchStats = None
+) -> Move:
+    # the board is changed in place by every move and restored from the undo stack
+    # after the recursive call, so the whole search works on a single board
+    if undo is None:
+        undo = []
+    if stats is not None:
+        stats.nodes += 1
+
     # max depth reached, return heuristic value
     if depth == 0:
         return Move(None, heuristic(player, board))
@@ -268,13 +512,18 @@ def minimax(player: str, turn: str, board: List[str], depth: int, heuristic) ->
     moves = legal_moves(turn, board)
 
     for move in moves:
-        # get score 
-        result = minimax(player, opponent(turn), board, depth - 1, heuristic)
+        # make move, get score of the resulting board and restore the board
+        make_move_undo(move, turn, board, undo, heuristic)
+        try:
+            result = minimax(player, opponent(turn), board, depth - 1, heuristic, undo, stats)
+        finally:
+            unmake_move(board, undo, heuristic)
 
         # get new best move and ...
         # when maximizing, result me be greater than best
-        if maximizing(player, turn) and result.score > best.score:
-            best = Move(move, result.score)
+        if maximizing(player, turn):
+            if result.score > best.score:
+                best = Move(move, result.score)
         # when not maximizing, result must be less than best
         elif result.score < best.score:
             best = Move(move, result.score)
@@ -288,15 +537,57 @@ def minimax_ab(
      depth: int,
      alpha: float, 
      beta: float, 
-     heuristic
+     heuristic,
+     undo: List[Tuple[int, List[int]]] = None,
+     stats: SearchStats = None,
+     table: TranspositionTable = None,
+     key: int = None,
+     deadline: float = None,
+     pv: List[int] = None,
+     line: List[int] = None,
+     ordering: MoveOrdering = None
 ) -> Move:
+    # same make/unmake scheme as minimax
+    # with a transposition table, key is the zobrist hash of the node (computed at the root)
+    # deadline is a time.perf_counter() value, after which SearchTimeout is raised
+    # pv is a principal variation from an earlier search that is searched first,
+    # line is filled with the principal variation of this search
+    # ordering sorts the moves, and learns from the cutoffs (the ply is the undo stack size)
+    if undo is None:
+        undo = []
+    if stats is not None:
+        stats.nodes += 1
+    if deadline is not None and time.perf_counter() > deadline:
+        raise SearchTimeout()
+
     # max depth reached, return heuristic value
     if depth == 0:
         return Move(None, heuristic(player, board))
+
+    # look up the position, a deep enough entry can give the score or narrow the window
+    hash_move = None
+    if table is not None:
+        if key is None:
+            key = zobrist_hash(player, turn, board)
+        entry = table.probe(key)
+        if entry is not None:
+            hash_move = entry.move
+            if entry.depth >= depth:
+                if entry.bound == EXACT:
+                    return Move(entry.move, entry.score)
+                if entry.bound == LOWER:
+                    alpha = max(alpha, entry.score)
+                else:
+                    beta = min(beta, entry.score)
+                if beta <= alpha:
+                    return Move(entry.move, entry.score)
+    node_key, alpha_init, beta_init = key, alpha, beta
     
     # if player cannot make moves, switch turn
     if not any_legal_move(turn, board):
         turn = opponent(turn)
+        if key is not None:
+            key ^= ZOBRIST_TURN
 
         # if still no turns, game is over and return heuristic value
         if not any_legal_move(turn, board):
@@ -306,46 +597,284 @@ def minimax_ab(
     init_score = -float('INF') if maximizing(player, turn) else float("INF")
     best = Move(-1, init_score)
 
-    # get all availabe moves
+    # get all availabe moves, the best move of an earlier search first
     moves = legal_moves(turn, board)
+    if ordering is not None:
+        moves = ordering.order(moves, turn, len(undo))
+    first = pv[0] if pv else hash_move
+    if first in moves:
+        moves.remove(first)
+        moves.insert(0, first)
+
+    if stats is not None:
+        stats.expanded += 1
+
+    for index, move in enumerate(moves):
+        # make move, get score of the resulting board and restore the board
+        make_move_undo(move, turn, board, undo, heuristic)
+        child_key = None
+        if key is not None:
+            child_key = key ^ ZOBRIST[turn][move] ^ ZOBRIST_TURN
+            for square in undo[-1][1]:
+                child_key ^= ZOBRIST_FLIP[square]
+        # only the first move follows the principal variation
+        child_pv = pv[1:] if pv and move == pv[0] else None
+        child_line = [] if line is not None else None
+        try:
+            result = minimax_ab(player, opponent(turn), board, depth - 1, alpha, beta, heuristic, undo, stats, table,
+                                child_key, deadline, child_pv, child_line, ordering)
+        finally:
+            # also when the search is aborted, so the board and heuristic stay usable
+            unmake_move(board, undo, heuristic)
+
+        # get new best move and apply alpha beta pruning
+        # when maximizing, result me be greater than best and raises alpha
+        if maximizing(player, turn):
+            improved = result.score > best.score
+            alpha = max(alpha, result.score)
+        # when not maximizing, result must be less than best and lowers beta
+        else:
+            improved = result.score < best.score
+            beta = min(beta, result.score)
+        if improved:
+            best = Move(move, result.score)
+            if line is not None:
+                line[:] = [move] + child_line
+        if beta <= alpha:
+            if stats is not None:
+                stats.cutoffs += 1
+                stats.first_move_cutoffs += index == 0
+            if ordering is not None:
+                ordering.cutoff(move, turn, depth, len(undo))
+            break
 
-    for move in moves:
-        # get move
-        result = minimax_ab(player, opponent(turn), board, depth - 1, alpha, beta, heuristic)
+    if stats is not None:
+        stats.moves_searched += index + 1
 
-        # get new best move and ...
-        # when maximizing, result me be greater than best
-        if maximizing(player, turn) and result.score > best.score:
-            best = Move(move, result.score)
-        # when not maximizing, result must be less than best
-        elif result.score < best.score:
-            best = Move(move, result.score)
+    # a score outside the initial window only bounds the real value
+    if table is not None:
+        if best.score <= alpha_init:
+            bound = UPPER
+        elif best.score >= beta_init:
+            bound = LOWER
+        else:
+            bound = EXACT
+        table.store(node_key, depth, bound, best.move, best.score)
+
+    return best
+
+def minimax_ab_copy(
+     player: str,
+     turn: str,
+     board: List[str],
+     depth: int,
+     alpha: float,
+     beta: float,
+     heuristic,
+     stats: SearchStats = None
+) -> Move:
+    # minimax_ab that makes every move on a copy of the board instead of undoing it,
+    # only used to compare against in benchmark_search
+    if stats is not None:
+        stats.nodes += 1
+
+    if depth == 0:
+        return Move(None, heuristic(player, board))
 
-        # apply alpha beta pruning
-        if maximizing(player, turn) and result.score > alpha:
-            alpha = result.score
-        elif result.score < beta:
-            beta = result.score
+    if not any_legal_move(turn, board):
+        turn = opponent(turn)
+        if not any_legal_move(turn, board):
+            return Move(None, heuristic(player, board))
+
+    init_score = -float('INF') if maximizing(player, turn) else float("INF")
+    best = Move(-1, init_score)
+
+    for move in legal_moves(turn, board):
+        child = make_move(move, turn, board[:])
+        result = minimax_ab_copy(player, opponent(turn), child, depth - 1, alpha, beta, heuristic, stats)
+
+        if maximizing(player, turn):
+            if result.score > best.score:
+                best = Move(move, result.score)
+            alpha = max(alpha, result.score)
+        else:
+            if result.score < best.score:
+                best = Move(move, result.score)
+            beta = min(beta, result.score)
         if beta <= alpha:
             break
 
     return best
-        
+
+def iterative_deepening(
+     player: str,
+     board: List[str],
+     budget: float,
+     heuristic,
+     table: TranspositionTable = None,
+     stats: SearchStats = None,
+     ordering: MoveOrdering = None,
+     max_depth: int = None
+) -> Move:
+    # search with minimax_ab at depth 1, 2, 3, ... until budget seconds have passed, and
+    # return the best move of the deepest search that finished. Every iteration searches
+    # the principal variation of the previous one first, and finds the best moves of the
+    # previous one in the table. Depth 1 is always finished, so there is always a move.
+    # without a budget (None), it searches up to max_depth
+    if stats is None:
+        stats = SearchStats()
+    deadline = time.perf_counter() + budget if budget is not None else None
+    max_depth = min(max_depth or 64, count_empty(board))
+    best, pv = None, []
+
+    for depth in range(1, max_depth + 1):
+        line = []
+        try:
+            # the board is restored by unmake_move, also when the search is aborted
+            result = minimax_ab(player, player, board, depth, -float('INF'), float('INF'), heuristic,
+                                stats=stats, table=table, deadline=deadline if best else None, pv=pv, line=line,
+                                ordering=ordering)
+        except SearchTimeout:
+            break
+        best, pv = result, line
+        stats.depth = depth
+
+    return best
+
 def minimax_strategy(player: str, board: List[str]) -> int:
     depth = 5
-    heuristic = heuristic_othello
+    heuristic = IncrementalEvaluator(board)
 
     return minimax(player, player, board, depth, heuristic).move
 
-def minimax_ab_strategy(player: str, board: List[str]) -> int:
-    depth = 11
-    heuristic = heuristic_othello
-
-    return minimax_ab(player, player, board, depth, -float('INF'), float('INF'), heuristic).move
+# the table is kept between moves; its counters show how well the size fits
+TRANSPOSITION_TABLE = TranspositionTable()
 
-black_strategy = minimax_ab_strategy
-white_strategy = random_strategy
+# the depth of minimax_ab_strategy (and parallel_minimax_ab_strategy): about 0.4 secs per
+# move, at most a few; depth 11 takes minutes per move, see benchmark_search and
+# benchmark_table
+MINIMAX_AB_DEPTH = 6
 
-board, final_score = play(black_strategy, white_strategy)
-print("score black:", final_score)
-print("score white:", -final_score)
\ No newline at end of file
+def minimax_ab_strategy(player: str, board: List[str]) -> int:
+    depth = MINIMAX_AB_DEPTH
+    heuristic = IncrementalEvaluator(board)
+    table = TRANSPOSITION_TABLE
+    table.new_search()
+
+    ordering = MoveOrdering()
+
+    # deepening to the depth costs fewer nodes than one search: the shallower searches
+    # leave the best move of every position in the table, to search first
+    return iterative_deepening(player, board, None, heuristic, table, ordering=ordering, max_depth=depth).move
+
+def benchmark_search(depths=range(5, 12)):
+    # compare make/unmake search with copy-per-child search from the initial position
+    # both visit the same tree, so the node counts must agree
+    for depth in depths:
+        nodes = []
+        for search in (minimax_ab, minimax_ab_copy):
+            board, stats = initial_board(), SearchStats()
+            t0 = time.perf_counter()
+            best = search(BLACK, BLACK, board, depth, -float('INF'), float('INF'), heuristic_othello, stats=stats)
+            t1 = time.perf_counter()
+            print("depth {:2d} {:>16}: move {} score {:4} in {} nodes, {:.3f} secs, {:.0f} nodes/sec"
+                  .format(depth, search.__name__, best.move, best.score, stats.nodes, t1 - t0, stats.nodes / (t1 - t0)))
+            nodes.append(stats.nodes)
+        assert nodes[0] == nodes[1]
+
+def timed_strategy(budget: float):
+    # make an iterative deepening strategy that takes about budget seconds per move
+    def strategy(player: str, board: List[str]) -> int:
+        table = TRANSPOSITION_TABLE
+        table.new_search()
+        return iterative_deepening(player, board, budget, IncrementalEvaluator(board), table, ordering=MoveOrdering()).move
+    strategy.__name__ = 'timed_strategy_%gs' % budget
+    return strategy
+
+iterative_deepening_strategy = timed_strategy(1.0)
+
+def benchmark_table(depths=(5, 7, 9, 11), size: int = 2 ** 18, plies: int = 20):
+    # node counts of minimax_ab (with move ordering) on midgame positions: without a table,
+    # with a table, and deepening to the depth with a table, like minimax_ab_strategy
+    positions = benchmark_positions(n=3, plies=plies)[1:]
+    for depth in depths:
+        for name in ('no table', 'table', 'deepening'):
+            stats, table = SearchStats(), TranspositionTable(size)
+            t0 = time.perf_counter()
+            for board in positions:
+                ordering = MoveOrdering()
+                if name == 'deepening':
+                    iterative_deepening(BLACK, board, None, heuristic_othello, table, stats, ordering, depth)
+                else:
+                    minimax_ab(BLACK, BLACK, board, depth, -float('INF'), float('INF'), heuristic_othello, stats=stats,
+                               table=table if name == 'table' else None, ordering=ordering)
+            t1 = time.perf_counter()
+            print("depth {:2d} {:>9}: {} nodes, {:.3f} secs per position"
+                  .format(depth, name, stats.nodes, (t1 - t0) / len(positions)))
+            if name != 'no table':
+                print("    ", table)
+
+def benchmark_evaluation(depth: int = 6, leaves: int = 100000):
+    # cost of a leaf evaluation, and of a search, with heuristic_othello and IncrementalEvaluator
+    board = initial_board()
+    for move, player in ((34, BLACK), (33, WHITE), (43, BLACK), (53, WHITE)):
+        make_move(move, player, board)
+    for heuristic in (heuristic_othello, IncrementalEvaluator(board)):
+        name = type(heuristic).__name__ if isinstance(heuristic, IncrementalEvaluator) else heuristic.__name__
+        t0 = time.perf_counter()
+        for _ in range(leaves):
+            heuristic(BLACK, board)
+        t1 = time.perf_counter()
+        result = minimax_ab(BLACK, BLACK, board, depth, -float('INF'), float('INF'), heuristic)
+        t2 = time.perf_counter()
+        print("{:>20}: {:.3f} usecs per leaf, depth {} search {:.3f} secs (move {} score {})"
+              .format(name, (t1 - t0) / leaves * 1e6, depth, t2 - t1, result.move, result.score))
+
+def benchmark_positions(n: int = 4, plies: int = 12, seed: int = 7) -> List[List[str]]:
+    # a fixed set of positions to compare searches on: the initial board and n positions
+    # after plies random moves, all with black to move
+    rng = random.Random(seed)
+    positions = [initial_board()]
+    while len(positions) <= n:
+        board, player = initial_board(), BLACK
+        for _ in range(plies):
+            make_move(rng.choice(legal_moves(player, board)), player, board)
+            player = next_player(board, player)
+            if player is None:
+                break
+        if player == BLACK:
+            positions.append(board)
+    return positions
+
+def benchmark_ordering(depth: int = 6):
+    # compare move orderings of minimax_ab on benchmark_positions (without transposition table)
+    orderings = [
+        None,
+        MoveOrdering(corners=True, weights=False, history=False, killers=False),
+        MoveOrdering(corners=False, weights=True, history=False, killers=False),
+        MoveOrdering(corners=False, weights=False, history=True, killers=False),
+        MoveOrdering(corners=False, weights=False, history=False, killers=True),
+        MoveOrdering(),
+    ]
+    positions = benchmark_positions()
+    for ordering in orderings:
+        stats = SearchStats()
+        t0 = time.perf_counter()
+        for board in positions:
+            if ordering is not None:
+                ordering.reset()
+            minimax_ab(BLACK, BLACK, board, depth, -float('INF'), float('INF'), heuristic_othello,
+                       stats=stats, ordering=ordering)
+        t1 = time.perf_counter()
+        print("{:>35}: {:7d} nodes, cutoff rate {:.2f}, first move cutoffs {:.2f}, branching {:.2f}, "
+              "effective branching {:.2f}, {:.3f} secs"
+              .format(str(ordering or 'square order'), stats.nodes, stats.cutoff_rate(), stats.first_move_rate(),
+                      stats.branching_factor(), stats.effective_branching_factor(depth, len(positions)), t1 - t0))
+
+if __name__ == '__main__':
+    black_strategy = minimax_ab_strategy
+    white_strategy = random_strategy
+
+    board, final_score = play(black_strategy, white_strategy)
+    print("score black:", final_score)
+    print("score white:", -final_score)
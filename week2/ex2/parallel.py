@@ -0,0 +1,116 @@
+import multiprocessing
+import os
+import time
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List
+
+from othello import (BLACK, MINIMAX_AB_DEPTH, Move, MoveOrdering, TranspositionTable, initial_board, legal_moves,
+                     make_move, minimax_ab, opponent, heuristic_othello, benchmark_positions)
+
+"""
+
+Parallel root-split search for Othello.
+
+The root moves are divided over worker processes, each searching the subtree of one
+root move with minimax_ab. Following "young brothers wait", the first (eldest) root
+move is searched on its own first; its score is a lower bound alpha for the root, and
+the other moves are only searched for a better score than alpha. Every finished root
+move that raises alpha publishes it in a shared value, so moves that start later get
+the narrowest window known so far.
+
+Each worker keeps its own transposition table and move ordering between the searches.
+"""
+
+# per worker process, set by init_worker
+shared_alpha = None
+worker_table = None
+worker_ordering = None
+
+def init_worker(alpha, table_size: int):
+    global shared_alpha, worker_table, worker_ordering
+    shared_alpha = alpha
+    worker_table = TranspositionTable(table_size)
+    worker_ordering = MoveOrdering()
+
+def search_root_move(player: str, board: List[str], move: int, depth: int, heuristic) -> Move:
+    # search the subtree of one root move, with the best alpha found by the others so far
+    alpha = shared_alpha.value
+    child = make_move(move, player, board[:])
+    worker_table.new_search()
+    result = minimax_ab(player, opponent(player), child, depth - 1, alpha, float('INF'), heuristic, table=worker_table,
+                        ordering=worker_ordering)
+    # publish a better lower bound for the root
+    with shared_alpha.get_lock():
+        if result.score > shared_alpha.value:
+            shared_alpha.value = result.score
+    return Move(move, result.score)
+
+class ParallelSearch:
+    # a pool of worker processes that search the root moves, keep it for many searches
+    def __init__(self, workers: int = None, table_size: int = 2 ** 18):
+        self.workers = workers or os.cpu_count()
+        self.alpha = multiprocessing.Value('d', -float('INF'))
+        self.executor = ProcessPoolExecutor(self.workers, initializer=init_worker, initargs=(self.alpha, table_size))
+
+    def shutdown(self):
+        self.executor.shutdown()
+
+    def search(self, player: str, board: List[str], depth: int, heuristic) -> Move:
+        # best root move for player, the player to move on board
+        moves = legal_moves(player, board)
+        if len(moves) <= 1 or depth <= 1:
+            return minimax_ab(player, player, board[:], depth, -float('INF'), float('INF'), heuristic)
+
+        # eldest brother first, to get an alpha for the others
+        self.alpha.value = -float('INF')
+        best = self.executor.submit(search_root_move, player, board, moves[0], depth, heuristic).result()
+
+        # the young brothers in parallel
+        futures = [self.executor.submit(search_root_move, player, board, move, depth, heuristic) for move in moves[1:]]
+        for future in as_completed(futures):
+            result = future.result()
+            if result.score > best.score:
+                best = result
+        return best
+
+# a pool shared by the parallel strategy, created on first use
+parallel_search = None
+
+def parallel_minimax_ab_strategy(player: str, board: List[str]) -> int:
+    global parallel_search
+    depth = MINIMAX_AB_DEPTH
+    heuristic = heuristic_othello
+    if parallel_search is None:
+        parallel_search = ParallelSearch()
+
+    return parallel_search.search(player, board, depth, heuristic).move
+
+# -----------------------------------------------------------------------------
+# Benchmarking
+
+def benchmark(depth: int = 7, workers=(1, 2, 4, 8)):
+    # speedup of the parallel search over serial minimax_ab (with a transposition table and
+    # move ordering like minimax_ab_strategy) at the same depth, on the same positions
+    positions = benchmark_positions()
+
+    t0 = time.perf_counter()
+    for board in positions:
+        minimax_ab(BLACK, BLACK, board[:], depth, -float('INF'), float('INF'), heuristic_othello,
+                   table=TranspositionTable(), ordering=MoveOrdering())
+    serial = time.perf_counter() - t0
+    print('serial   : {:.3f} secs at depth {} on {} positions'.format(serial, depth, len(positions)))
+
+    for n in workers:
+        search = ParallelSearch(n)
+        # start the workers before timing
+        search.search(BLACK, initial_board(), 2, heuristic_othello)
+        t0 = time.perf_counter()
+        for board in positions:
+            search.search(BLACK, board, depth, heuristic_othello)
+        t1 = time.perf_counter()
+        search.shutdown()
+        print('{} workers: {:.3f} secs, speedup {:.2f}'.format(n, t1 - t0, serial / (t1 - t0)))
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,117 @@
+import argparse
+import os
+import random
+import time
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+import book
+import endgame
+import othello
+import parallel
+from othello import BLACK, WHITE, initial_board, get_move, make_move, next_player, score
+
+"""
+
+Headless tournaments between Othello strategies.
+
+    python tournament.py random minimax_ab --games 100 --workers 4 --seed 1
+
+plays 100 games between two registered strategies in 4 worker processes, without
+printing any boards, and reports the results of the first strategy. The strategies
+switch colors every game, so both play black equally often. Game i is played with
+random seed seed + i, so a tournament can be repeated exactly (except for strategies
+that depend on time, like the timed ones).
+
+From Python, run_tournament('random', 'minimax', games=100) returns the same report.
+"""
+
+# strategies by name; a worker process looks up a strategy by its name
+STRATEGIES = {
+    'random': othello.random_strategy,
+    'minimax': othello.minimax_strategy,
+    'minimax_ab': othello.minimax_ab_strategy,
+    'iterative_deepening': othello.iterative_deepening_strategy,
+    'timed_0.1s': othello.timed_strategy(0.1),
+    'parallel_minimax_ab': parallel.parallel_minimax_ab_strategy,
+    'endgame_0.1s': endgame.endgame_strategy(othello.timed_strategy(0.1)),
+    # uses the opening book of book.py, or plays without it when it isn't built
+    'book_endgame_0.1s': book.book_strategy(endgame.endgame_strategy(othello.timed_strategy(0.1))),
+}
+
+Game = namedtuple('Game', 'seed margin latencies')
+Report = namedtuple('Report', 'games wins draws losses mean_margin latency')
+
+def play_game(strategy: str, other: str, strategy_color: str, seed: int) -> Game:
+    # play one game and return the score margin of strategy, and its time per move
+    random.seed(seed)
+    # start without the positions of earlier games, so every game can be repeated
+    othello.TRANSPOSITION_TABLE.clear()
+    strategies = {strategy_color: STRATEGIES[strategy], othello.opponent(strategy_color): STRATEGIES[other]}
+
+    board = initial_board()
+    player = BLACK
+    latencies = []
+    while player is not None:
+        t0 = time.perf_counter()
+        move = get_move(strategies[player], player, board)
+        if player == strategy_color:
+            latencies.append(time.perf_counter() - t0)
+        make_move(move, player, board)
+        player = next_player(board, player)
+
+    return Game(seed, score(strategy_color, board), latencies)
+
+def percentile(values: List[float], p: float) -> float:
+    # the p-th percentile of values, by linear interpolation between the closest ranks
+    values = sorted(values)
+    rank = (len(values) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+def run_tournament(strategy: str, other: str, games: int = 100, workers: int = None, seed: int = 0) -> Report:
+    # play games between strategy and other in parallel and report the results of strategy
+    for name in (strategy, other):
+        if name not in STRATEGIES:
+            raise ValueError('unknown strategy %r, choose from %s' % (name, ', '.join(STRATEGIES)))
+
+    colors = [BLACK if i % 2 == 0 else WHITE for i in range(games)]
+    seeds = [seed + i for i in range(games)]
+    with ProcessPoolExecutor(workers or os.cpu_count()) as executor:
+        results = list(executor.map(play_game, [strategy] * games, [other] * games, colors, seeds))
+
+    margins = [game.margin for game in results]
+    latencies = [t for game in results for t in game.latencies]
+    latency = {p: percentile(latencies, p) for p in (50, 90, 99)} if latencies else {}
+    return Report(
+        games,
+        sum(m > 0 for m in margins),
+        sum(m == 0 for m in margins),
+        sum(m < 0 for m in margins),
+        sum(margins) / games,
+        latency,
+    )
+
+def print_report(strategy: str, other: str, report: Report):
+    print('{} vs {}: {} games'.format(strategy, other, report.games))
+    print('win/draw/loss: {}/{}/{}'.format(report.wins, report.draws, report.losses))
+    print('mean score margin: {:+.2f}'.format(report.mean_margin))
+    print('latency per move: ' + ', '.join('p{} {:.4f} secs'.format(p, t) for p, t in report.latency.items()))
+
+def main(args: List[str] = None):
+    parser = argparse.ArgumentParser(description='Play a headless tournament between two Othello strategies.')
+    parser.add_argument('strategy', choices=STRATEGIES, help='the strategy that is reported on')
+    parser.add_argument('other', choices=STRATEGIES, help='its opponent')
+    parser.add_argument('-n', '--games', type=int, default=100)
+    parser.add_argument('-j', '--workers', type=int, default=None, help='number of processes (default: all cores)')
+    parser.add_argument('-s', '--seed', type=int, default=0)
+    options = parser.parse_args(args)
+
+    report = run_tournament(options.strategy, options.other, options.games, options.workers, options.seed)
+    print_report(options.strategy, options.other, report)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+import random
+import time
+
+from typing import Callable, Dict, List
+
+"""
+
+A 2048 board packed in a 64-bit int.
+
+Every cell is 4 bits holding the exponent of its tile (1 is a 2, 2 is a 4, ..., 0 is an
+empty cell). The cell in row y and column x is at bits 4 * (4y + x), so a row is 16 bits
+and row y is (board >> 16y) & 0xFFFF, with the leftmost cell in the lowest bits.
+
+A move works on every row (or column) on its own, and there are only 65536 rows, so the
+result of every move of every row is computed once, in tables:
+
+- ROW_LEFT[row] and ROW_RIGHT[row]: the row moved left or right
+- COL_UP[row] and COL_DOWN[row]: the same for a column, where row is the column read top
+  down (as a row of the transposed board), and the result is spread back into a column
+  (the cells at bits 0, 16, 32 and 48)
+
+The transpose is a table lookup too: SPREAD[row] is row as a column.
+
+A move is then 4 lookups (and a transpose for up and down) instead of building lists.
+Exponents stop at 15 (a 32768 tile); two 32768 tiles merge into a 32768.
+"""
+
+ROW_MASK = 0xFFFF
+
+def merge_row_left(cells: List[int]) -> List[int]:
+    # move a row of 4 exponents left, like model.merge_left does for tiles
+    tiles = [c for c in cells if c]
+    merged = []
+    i = 0
+    while i < len(tiles):
+        if i + 1 < len(tiles) and tiles[i] == tiles[i + 1]:
+            merged.append(min(tiles[i] + 1, 15))
+            i += 2
+        else:
+            merged.append(tiles[i])
+            i += 1
+    return merged + [0] * (4 - len(merged))
+
+def row_cells(row: int) -> List[int]:
+    return [(row >> (4 * i)) & 0xF for i in range(4)]
+
+def cells_row(cells: List[int]) -> int:
+    return cells[0] | (cells[1] << 4) | (cells[2] << 8) | (cells[3] << 12)
+
+def spread(row: int) -> int:
+    # the 4 cells of a row as a column: cell i at bits 16i
+    return (row & 0xF) | ((row >> 4) & 0xF) << 16 | ((row >> 8) & 0xF) << 32 | ((row >> 12) & 0xF) << 48
+
+def make_tables():
+    left, right, up, down, spread_table = [], [], [], [], []
+    for row in range(1 << 16):
+        cells = row_cells(row)
+        l = cells_row(merge_row_left(cells))
+        r = cells_row(merge_row_left(cells[::-1])[::-1])
+        left.append(l)
+        right.append(r)
+        up.append(spread(l))
+        down.append(spread(r))
+        spread_table.append(spread(row))
+    return left, right, up, down, spread_table
+
+ROW_LEFT, ROW_RIGHT, COL_UP, COL_DOWN, SPREAD = make_tables()
+
+# -----------------------------------------------------------------------------
+# Conversion
+
+def to_bitboard(b: List[List[int]]) -> int:
+    # a board of tiles (lists, as in model) to a bitboard
+    x = 0
+    for y, row in enumerate(b):
+        for i, tile in enumerate(row):
+            if tile:
+                x |= (tile.bit_length() - 1) << (4 * (4 * y + i))
+    return x
+
+def to_lists(x: int) -> List[List[int]]:
+    # a bitboard to a board of tiles (lists, as in model)
+    return [[1 << e if e else 0 for e in row_cells((x >> (16 * y)) & ROW_MASK)] for y in range(4)]
+
+# -----------------------------------------------------------------------------
+# Moves
+
+def transpose(x: int) -> int:
+    # rows become columns: row y of x is column y of the result
+    return SPREAD[x & ROW_MASK] | SPREAD[(x >> 16) & ROW_MASK] << 4 | \
+           SPREAD[(x >> 32) & ROW_MASK] << 8 | SPREAD[(x >> 48) & ROW_MASK] << 12
+
+def move_left(x: int) -> int:
+    return ROW_LEFT[x & ROW_MASK] | ROW_LEFT[(x >> 16) & ROW_MASK] << 16 | \
+           ROW_LEFT[(x >> 32) & ROW_MASK] << 32 | ROW_LEFT[x >> 48] << 48
+
+def move_right(x: int) -> int:
+    return ROW_RIGHT[x & ROW_MASK] | ROW_RIGHT[(x >> 16) & ROW_MASK] << 16 | \
+           ROW_RIGHT[(x >> 32) & ROW_MASK] << 32 | ROW_RIGHT[x >> 48] << 48
+
+def move_up(x: int) -> int:
+    t = transpose(x)
+    return COL_UP[t & ROW_MASK] | COL_UP[(t >> 16) & ROW_MASK] << 4 | \
+           COL_UP[(t >> 32) & ROW_MASK] << 8 | COL_UP[t >> 48] << 12
+
+def move_down(x: int) -> int:
+    t = transpose(x)
+    return COL_DOWN[t & ROW_MASK] | COL_DOWN[(t >> 16) & ROW_MASK] << 4 | \
+           COL_DOWN[(t >> 32) & ROW_MASK] << 8 | COL_DOWN[t >> 48] << 12
+
+# in the order of model.MERGE_FUNCTIONS
+MOVE_FUNCTIONS: Dict[str, Callable[[int], int]] = {
+    'left': move_left,
+    'right': move_right,
+    'up': move_up,
+    'down': move_down
+}
+
+def move_exists(x: int) -> bool:
+    # a move exists when some move changes the board
+    return move_left(x) != x or move_right(x) != x or move_up(x) != x or move_down(x) != x
+
+def empty_cells(x: int) -> List[int]:
+    # the empty cells (4y + x), in the order of model.get_empty_tiles (column by column)
+    return [4 * y + i for i in range(4) for y in range(4) if not (x >> (4 * (4 * y + i))) & 0xF]
+
+def count_empty(x: int) -> int:
+    # a cell is empty when its 4 bits are 0: fold them into the lowest bit of the cell
+    x |= x >> 2
+    x |= x >> 1
+    return 16 - bin(x & 0x1111111111111111).count('1')
+
+def max_exponent(x: int) -> int:
+    return max((x >> (4 * i)) & 0xF for i in range(16))
+
+def add_two_four(x: int, rng=random) -> int:
+    # add a 2 (90%) or a 4 (10%) in a random empty cell
+    cells = empty_cells(x)
+    if not cells:
+        return x
+    return x | (1 if rng.random() < 0.9 else 2) << (4 * rng.choice(cells))
+
+# -----------------------------------------------------------------------------
+# Search
+
+# the snake pattern of the heuristics: a tile in cell (y, x) weighs 10 ** WEIGHTS[y][x]
+WEIGHTS = [
+    [15, 14, 13, 12],
+    [ 8,  9, 10, 11],
+    [ 7,  6,  5,  4],
+    [ 0,  1,  2,  3]
+]
+
+# CELL_SCORES[cell][e]: the weighted score of a tile 2^e in cell (4y + x)
+CELL_SCORES = [[(1 << e) * 10 ** WEIGHTS[cell // 4][cell % 4] if e else 0 for e in range(16)] for cell in range(16)]
+
+def heuristic_2048(x: int) -> float:
+    # model.heuristic_2048 on a bitboard, with the same values
+    if not move_exists(x):
+        return -float("INF")
+    score = 0
+    for cell in range(16):
+        score += CELL_SCORES[cell][(x >> (4 * cell)) & 0xF]
+    maxval = 1 << max_exponent(x)
+    corner = 1 << (x & 0xF) if x & 0xF else 0
+    if corner != maxval:
+        score -= abs(corner - maxval) ** 2
+    return score
+
+def expectimax(x: int, depth: int, player: bool, heuristic) -> float:
+    # model.expectimax on a bitboard, with the same values
+    if depth == 0 or (player and not move_exists(x)):
+        return heuristic(x)
+
+    score = 0
+    if player:
+        for move in MOVE_FUNCTIONS.values():
+            score = max(score, expectimax(move(x), depth - 1, False, heuristic))
+    else:
+        cells = empty_cells(x)
+        n = len(cells)
+        for cell in cells:
+            shift = 4 * cell
+            score += .9 * expectimax(x | 1 << shift, depth - 1, True, heuristic) / n + \
+                     .1 * expectimax(x | 2 << shift, depth - 1, True, heuristic) / n
+    return score
+
+def get_expectimax_move(x: int, depth: int = 4, heuristic=heuristic_2048) -> str:
+    results = [(move, expectimax(func(x), depth, False, heuristic)) for move, func in MOVE_FUNCTIONS.items()]
+    return max(results, key=lambda r: r[1])[0]
+
+# -----------------------------------------------------------------------------
+# Testing
+
+def random_board(rng: random.Random) -> List[List[int]]:
+    # a board of tiles up to 2048 with about half of the cells empty
+    return [[1 << rng.randint(1, 11) if rng.random() < 0.5 else 0 for _ in range(4)] for _ in range(4)]
+
+def test(boards: int = 2000):
+    # the cases of model.test on bitboards, and the moves of random boards
+    import model
+    cases = [
+        [[0, 2, 4, 4], [0, 2, 4, 8], [0, 0, 0, 4], [2, 2, 2, 2]],
+        [[2, 8, 4, 0], [16, 0, 0, 0], [2, 0, 2, 0], [2, 0, 0, 0]],
+        [[32, 64, 2, 16], [8, 32, 16, 2], [4, 16, 8, 4], [2, 8, 4, 2]],
+    ]
+    assert to_lists(move_left(to_bitboard(cases[0]))) == [[2, 8, 0, 0], [2, 4, 8, 0], [4, 0, 0, 0], [4, 4, 0, 0]]
+    assert to_lists(move_right(to_bitboard(cases[0]))) == [[0, 0, 2, 8], [0, 2, 4, 8], [0, 0, 0, 4], [0, 0, 4, 4]]
+    assert to_lists(move_up(to_bitboard(cases[0]))) == [[2, 4, 8, 4], [0, 2, 2, 8], [0, 0, 0, 4], [0, 0, 0, 2]]
+    assert to_lists(move_down(to_bitboard(cases[0]))) == [[0, 0, 0, 4], [0, 0, 0, 8], [0, 2, 8, 4], [2, 4, 2, 2]]
+    assert move_exists(to_bitboard(cases[0])) == True
+    assert to_lists(move_left(to_bitboard(cases[1]))) == [[2, 8, 4, 0], [16, 0, 0, 0], [4, 0, 0, 0], [2, 0, 0, 0]]
+    assert to_lists(move_right(to_bitboard(cases[1]))) == [[0, 2, 8, 4], [0, 0, 0, 16], [0, 0, 0, 4], [0, 0, 0, 2]]
+    assert to_lists(move_up(to_bitboard(cases[1]))) == [[2, 8, 4, 0], [16, 0, 2, 0], [4, 0, 0, 0], [0, 0, 0, 0]]
+    assert to_lists(move_down(to_bitboard(cases[1]))) == [[0, 0, 0, 0], [2, 0, 0, 0], [16, 0, 4, 0], [4, 8, 2, 0]]
+    assert move_exists(to_bitboard(cases[1])) == True
+    assert move_exists(to_bitboard(cases[2])) == False
+
+    rng = random.Random(1)
+    for _ in range(boards):
+        b = random_board(rng)
+        x = to_bitboard(b)
+        assert to_lists(x) == b
+        for direction, merge in model.MERGE_FUNCTIONS.items():
+            assert to_lists(MOVE_FUNCTIONS[direction](x)) == merge(b)
+        assert move_exists(x) == model.move_exists(b)
+        assert [4 * c.y + c.x for c in model.get_empty_tiles(b)] == empty_cells(x)
+        assert count_empty(x) == len(empty_cells(x))
+        assert heuristic_2048(x) == model.heuristic_2048(b)
+
+    # the same expectimax values, so the same moves
+    for _ in range(20):
+        b = random_board(rng)
+        x = to_bitboard(b)
+        for func, move in zip(model.MERGE_FUNCTIONS.values(), MOVE_FUNCTIONS.values()):
+            assert expectimax(move(x), 2, False, heuristic_2048) == \
+                   model.expectimax(func(b), 2, False, model.heuristic_2048)
+    print('bitboard: all tests passed')
+
+def benchmark(depth: int = 3, boards: int = 5):
+    # time of get_expectimax_move on lists (model) and on bitboards, on the same boards
+    import model
+    rng = random.Random(2)
+    positions = [random_board(rng) for _ in range(boards)]
+    for name, run in (('lists', lambda b: model.get_expectimax_move(b, depth, engine='lists')),
+                      ('bitboard', lambda b: get_expectimax_move(to_bitboard(b), depth))):
+        t0 = time.perf_counter()
+        moves = [run(b) for b in positions]
+        t1 = time.perf_counter()
+        print('{:8}: {:.3f} secs per move at depth {}, moves {}'.format(name, (t1 - t0) / boards, depth, moves))
+
+if __name__ == '__main__':
+    test()
+    benchmark()
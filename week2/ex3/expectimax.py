@@ -0,0 +1,261 @@
+import random
+import time
+
+from typing import List
+
+from bitboard import MOVE_FUNCTIONS, add_two_four, count_empty, empty_cells, move_exists
+from heuristic import TABLE_HEURISTIC
+
+"""
+
+Expectimax on bitboards with a transposition cache and chance-node pruning.
+
+- The cache: the same board is reached by different orders of moves and spawns, and again
+  in the search of the next move. The value of a node is kept by (board, depth left,
+  player or chance node), in a least recently used cache of a bounded size that is kept
+  between moves.
+- The pruning: every node knows the probability that the game gets there (the product
+  of the spawn probabilities on the way). A chance node below threshold is evaluated
+  with the heuristic instead of searched, so unlikely lines (like several 4 spawns in a
+  row) cost almost nothing.
+
+With threshold 0 the values are the same as bitboard.expectimax (and model.expectimax):
+the heuristic is heuristic.TABLE_HEURISTIC, the values of heuristic_2048 from tables
+over rows.
+
+timed_move chooses the depth itself: deeper when there are many distinct tiles and few
+empty cells (the crowded late game, where a move can lose the game), shallower on empty
+boards (with many spawns to branch over, and hardly a wrong move). It deepens one ply at
+a time until that depth, and stops at a time budget with the move of the deepest search
+that finished.
+"""
+
+# probability below which a chance node isn't searched
+THRESHOLD = 1e-2
+# number of nodes in the cache
+CACHE_SIZE = 2 ** 18
+# depths of timed_move, and its time budget per move in ms
+MIN_DEPTH = 2
+MAX_DEPTH = 8
+BUDGET_MS = 100
+
+class SearchTimeout(Exception):
+    # raised in a search that runs out of time
+    pass
+
+def distinct_tiles(x: int) -> int:
+    return len({(x >> (4 * i)) & 0xF for i in range(16)} - {0})
+
+def adaptive_depth(x: int) -> int:
+    # the depth for board x: the number of distinct tiles, but at most 4 while at
+    # least half of the board is empty
+    depth = max(MIN_DEPTH, min(MAX_DEPTH, distinct_tiles(x)))
+    return min(depth, 4) if count_empty(x) >= 8 else depth
+
+class MoveStats:
+    # counters of the search of one move
+    def __init__(self):
+        self.nodes = 0    # nodes visited
+        self.hits = 0     # nodes found in the cache
+        self.misses = 0   # nodes searched and stored in the cache
+        self.pruned = 0   # chance nodes evaluated because of their probability
+        self.depth = 0    # the depth of the deepest search that finished
+        self.target = 0   # the depth timed_move aimed for
+        self.empty = 0    # empty cells of the board
+        self.distinct = 0 # distinct tiles of the board
+        self.seconds = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / max(self.hits + self.misses, 1)
+
+    def __repr__(self):
+        return 'MoveStats(depth={}/{}, empty={}, distinct={}, nodes={}, hits={}, misses={}, hit_rate={:.2f}, ' \
+               'pruned={}, ms={:.1f})'.format(self.depth, self.target, self.empty, self.distinct, self.nodes, self.hits,
+                                             self.misses, self.hit_rate, self.pruned, 1000 * self.seconds)
+
+class ExpectimaxSearch:
+    def __init__(self, heuristic=TABLE_HEURISTIC, cache_size: int = CACHE_SIZE, threshold: float = THRESHOLD):
+        self.heuristic = heuristic
+        self.cache_size = cache_size
+        self.threshold = threshold
+        self.cache = {}  # the recent generation, at most cache_size // 2 entries
+        self.old = {}    # the previous generation
+        self.stats = MoveStats()  # of the last move
+        self.history = []         # the stats of all moves
+        self.deadline = None      # a time.perf_counter() to stop at, for timed_move
+
+    def clear(self):
+        self.cache = {}
+        self.old = {}
+        self.history = []
+
+    def lookup(self, key: int):
+        # the value of key in the cache, or None
+        score = self.cache.get(key)
+        if score is None:
+            score = self.old.get(key)
+            if score is None:
+                return None
+            self.store(key, score)
+        self.stats.hits += 1
+        return score
+
+    def store(self, key: int, score: float):
+        cache = self.cache
+        if len(cache) >= self.cache_size // 2:
+            self.old = cache
+            cache = self.cache = {}
+        cache[key] = score
+
+    def evaluate(self, x: int) -> float:
+        # the heuristic of x, also cached (as depth 0)
+        key = x << 8
+        score = self.lookup(key)
+        if score is None:
+            self.stats.misses += 1
+            score = self.heuristic(x)
+            self.store(key, score)
+        return score
+
+    def value(self, x: int, depth: int, player: bool, probability: float) -> float:
+        # the expectimax value of board x with depth plies left; player is True when the
+        # player moves next, False when a tile spawns next
+        stats = self.stats
+        stats.nodes += 1
+        if self.deadline is not None and not stats.nodes & 255 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        if depth == 0 or (player and not move_exists(x)):
+            return self.evaluate(x)
+        if not player and probability < self.threshold:
+            stats.pruned += 1
+            return self.evaluate(x)
+
+        key = x << 8 | depth << 1 | player
+        score = self.lookup(key)
+        if score is not None:
+            return score
+        stats.misses += 1
+
+        score = 0
+        if player:
+            for move in MOVE_FUNCTIONS.values():
+                score = max(score, self.value(move(x), depth - 1, False, probability))
+        else:
+            cells = empty_cells(x)
+            n = len(cells)
+            for cell in cells:
+                shift = 4 * cell
+                score += .9 * self.value(x | 1 << shift, depth - 1, True, probability * .9 / n) / n + \
+                         .1 * self.value(x | 2 << shift, depth - 1, True, probability * .1 / n) / n
+
+        self.store(key, score)
+        return score
+
+    def best_move(self, x: int, depth: int) -> str:
+        # the move with the best value at depth, with the stats of its search in self.stats
+        self.stats = MoveStats()
+        self.stats.depth = depth
+        t0 = time.perf_counter()
+        results = [(move, self.value(func(x), depth, False, 1.0)) for move, func in MOVE_FUNCTIONS.items()]
+        self.stats.seconds = time.perf_counter() - t0
+        self.history.append(self.stats)
+        return max(results, key=lambda r: r[1])[0]
+
+    def timed_move(self, x: int, budget_ms: float = BUDGET_MS, max_depth: int = None) -> str:
+        # the best move of an iterative deepening search up to adaptive_depth(x) (or max_depth)
+        # that stops after budget_ms; the stats of all iterations are in self.stats. when
+        # even depth 1 doesn't finish, the best of the moves it searched, or the first move
+        # that changes x
+        stats = self.stats = MoveStats()
+        stats.target = max_depth or adaptive_depth(x)
+        stats.empty = count_empty(x)
+        stats.distinct = distinct_tiles(x)
+        t0 = time.perf_counter()
+        self.deadline = t0 + budget_ms / 1000
+        best = next((move for move, func in MOVE_FUNCTIONS.items() if func(x) != x), 'left')
+        results = []
+        try:
+            for depth in range(1, stats.target + 1):
+                results = []
+                for move, func in MOVE_FUNCTIONS.items():
+                    results.append((move, self.value(func(x), depth, False, 1.0)))
+                best = max(results, key=lambda r: r[1])[0]
+                stats.depth = depth
+        except SearchTimeout:
+            if stats.depth == 0 and results:
+                best = max(results, key=lambda r: r[1])[0]
+        finally:
+            self.deadline = None
+        stats.seconds = time.perf_counter() - t0
+        self.history.append(stats)
+        return best
+
+# -----------------------------------------------------------------------------
+# Benchmarking
+
+def game_positions(n: int = 20, every: int = 10, depth: int = 2, seed: int = 1) -> List[int]:
+    # n boards of a game played by a shallow search, every so many moves, so early and
+    # late game positions
+    rng = random.Random(seed)
+    search = ExpectimaxSearch()
+    x = add_two_four(add_two_four(0, rng), rng)
+    positions = []
+    moves = 0
+    while move_exists(x) and len(positions) < n:
+        if moves % every == 0:
+            positions.append(x)
+        y = MOVE_FUNCTIONS[search.best_move(x, depth)](x)
+        if y == x:
+            break
+        x = add_two_four(y, rng)
+        moves += 1
+    return positions
+
+def benchmark(depths=(4, 6), n: int = 20):
+    # ms per move of expectimax without and with the cache and pruning, on the positions of
+    # a game; the cache is kept between the positions, like in a game
+    from bitboard import get_expectimax_move
+    positions = game_positions(n)
+    for depth in depths:
+        if depth <= 4:
+            t0 = time.perf_counter()
+            for x in positions:
+                get_expectimax_move(x, depth)
+            print('depth {}: {:.1f} ms per move for bitboard.expectimax'
+                  .format(depth, 1000 * (time.perf_counter() - t0) / len(positions)))
+        for name, search in (('cache', ExpectimaxSearch(threshold=0)), ('cache and pruning', ExpectimaxSearch())):
+            if depth > 4 and not search.threshold:
+                continue
+            for x in positions:
+                search.best_move(x, depth)
+            ms = sorted(1000 * s.seconds for s in search.history)
+            print('depth {}: {:.1f} ms per move (max {:.1f}), hit rate {:.2f}, {:.0f} nodes per move for {}'
+                  .format(depth, sum(ms) / len(ms), ms[-1],
+                          sum(s.hits for s in search.history) / sum(s.hits + s.misses for s in search.history),
+                          sum(s.nodes for s in search.history) / len(ms), name))
+
+def benchmark_timed(budget_ms: float = BUDGET_MS, moves: int = 300, seed: int = 1):
+    # play a game with timed_move, and print the depth, nodes and ms per move by the number
+    # of empty cells, to see the latency over the stages of the game
+    rng = random.Random(seed)
+    search = ExpectimaxSearch()
+    x = add_two_four(add_two_four(0, rng), rng)
+    for _ in range(moves):
+        if not move_exists(x):
+            break
+        x = add_two_four(MOVE_FUNCTIONS[search.timed_move(x, budget_ms)](x), rng)
+    print('{} moves with a budget of {} ms, max tile {}'.format(len(search.history), budget_ms,
+                                                              1 << max((x >> (4 * i)) & 0xF for i in range(16))))
+    print('empty  moves  depth  target   nodes      ms  max ms')
+    for empty in range(16, -1, -1):
+        group = [s for s in search.history if s.empty == empty]
+        if group:
+            print('{:5d}  {:5d}  {:5.1f}  {:6.1f}  {:6.0f}  {:6.1f}  {:6.1f}'.format(
+                empty, len(group), sum(s.depth for s in group) / len(group), sum(s.target for s in group) / len(group),
+                sum(s.nodes for s in group) / len(group), 1000 * sum(s.seconds for s in group) / len(group),
+                1000 * max(s.seconds for s in group)))
+
+if __name__ == '__main__':
+    benchmark()
+    benchmark_timed()
@@ -0,0 +1,138 @@
+import random
+import time
+
+from typing import List
+
+import numpy as np
+
+from bitboard import ROW_LEFT, ROW_MASK, ROW_RIGHT, WEIGHTS, heuristic_2048, transpose
+
+"""
+
+A 2048 heuristic from tables over rows.
+
+All terms of the heuristic are sums over the rows and the columns of the board, so they
+are computed for all 65536 rows once, and a board is evaluated with 8 table lookups (its
+4 rows, and its 4 columns as the rows of the transposed board) and int arithmetic:
+
+- snake: the tiles weighted by the snake pattern, tile * base ** weights[y][x], like
+  model.heuristic_2048. weights is one table (bitboard.WEIGHTS by default), and row y
+  has its own table for row y of the weights
+- monotonicity: a penalty for tiles that don't decrease or increase along a row or column,
+  the smaller of both directions, on the exponents to the power 4
+- smoothness: a penalty for differences between neighbouring tiles, on the exponents
+- empty: a bonus per empty cell
+
+and the penalty of model.heuristic_2048 when the largest tile is not in the corner.
+A board without moves is -inf; whether a row or column can move is a table too.
+
+The tables are built with NumPy for all rows at once, and kept as lists, which are
+faster than arrays to index with a single int. The values are Python ints, so they are
+exact: the snake terms span 10 ** 0 to 10 ** 15 times the tiles, more than the 53 bits of
+a float. With float factors for the other terms the values become floats.
+"""
+
+def row_exponents() -> List[np.ndarray]:
+    # the exponents of the 4 cells of every row, from the left
+    rows = np.arange(1 << 16)
+    return [(rows >> (4 * i)) & 0xF for i in range(4)]
+
+def monotonicity(e: List[np.ndarray], power: int = 4) -> np.ndarray:
+    # the penalty for the rows not being monotone, in the best direction
+    decreasing = np.zeros(1 << 16, dtype=np.int64)
+    increasing = np.zeros(1 << 16, dtype=np.int64)
+    for a, b in zip(e, e[1:]):
+        diff = a ** power - b ** power
+        decreasing += np.where(diff < 0, -diff, 0)
+        increasing += np.where(diff > 0, diff, 0)
+    return np.minimum(decreasing, increasing)
+
+def smoothness(e: List[np.ndarray]) -> np.ndarray:
+    # the differences between neighbouring tiles, ignoring empty cells in between
+    total = np.zeros(1 << 16, dtype=np.int64)
+    for i in range(4):
+        # the next tile to the right of cell i
+        following = np.zeros(1 << 16, dtype=int)
+        for j in range(3, i, -1):
+            following = np.where(e[j] > 0, e[j], following)
+        total += np.where((e[i] > 0) & (following > 0), np.abs(e[i] - following), 0)
+    return total
+
+class TableHeuristic:
+    def __init__(self, weights: List[List[int]] = WEIGHTS, base: int = 10, corner_weight: int = 1,
+                 monotonicity_weight: int = 0, smoothness_weight: int = 0, empty_weight: int = 0):
+        # weights is the snake pattern; the other weights are the factors of the other
+        # terms. the defaults give the values of model.heuristic_2048
+        e = row_exponents()
+        # combined as Python ints, so large weights can't overflow int64
+        lines = [-monotonicity_weight * m - smoothness_weight * s
+                 for m, s in zip(monotonicity(e).tolist(), smoothness(e).tolist())]
+        empties = sum((ei == 0).astype(int) for ei in e).tolist()
+        # the snake and the empty cells are counted in the rows, the others in both.
+        # tiles * base ** weights reach 2 ** 15 * 10 ** 15, too much for int64, and a float
+        # would lose the cells of low weight next to those of high weight, so the tables
+        # hold Python ints (as heuristic_2048 does)
+        row_terms = [line + empty_weight * empty for line, empty in zip(lines, empties)]
+        self.rows = []
+        for y in range(4):
+            # cells[i][exponent]: the snake score of the tile in cell i of row y
+            cells = [[(1 << exponent) * base ** w if exponent else 0 for exponent in range(16)] for w in weights[y]]
+            c0, c1, c2, c3 = cells
+            self.rows.append([c0[row & 0xF] + c1[(row >> 4) & 0xF] + c2[(row >> 8) & 0xF] + c3[row >> 12] + term
+                              for row, term in enumerate(row_terms)])
+        self.columns = lines
+        # the largest exponent of every row, whether the row can move left or right
+        self.max = np.maximum.reduce(e).tolist()
+        self.movable = [l != row or r != row for row, (l, r) in enumerate(zip(ROW_LEFT, ROW_RIGHT))]
+        # penalty[maximum][corner]: the penalty when the corner isn't the largest tile
+        values = [2 ** m if m else 0 for m in range(16)]
+        self.penalty = [[corner_weight * (values[m] - values[c]) ** 2 if m != c else 0 for c in range(16)]
+                        for m in range(16)]
+
+    def __call__(self, x: int) -> float:
+        r0, r1, r2, r3 = x & ROW_MASK, (x >> 16) & ROW_MASK, (x >> 32) & ROW_MASK, x >> 48
+        t = transpose(x)
+        c0, c1, c2, c3 = t & ROW_MASK, (t >> 16) & ROW_MASK, (t >> 32) & ROW_MASK, t >> 48
+        movable = self.movable
+        if not (movable[r0] or movable[r1] or movable[r2] or movable[r3] or
+                movable[c0] or movable[c1] or movable[c2] or movable[c3]):
+            return -float("INF")
+        rows, columns, maximum = self.rows, self.columns, self.max
+        return rows[0][r0] + rows[1][r1] + rows[2][r2] + rows[3][r3] + \
+            columns[c0] + columns[c1] + columns[c2] + columns[c3] - \
+            self.penalty[max(maximum[r0], maximum[r1], maximum[r2], maximum[r3])][x & 0xF]
+
+# the heuristic of the searches, with the values of model.heuristic_2048
+TABLE_HEURISTIC = TableHeuristic()
+
+def test(boards: int = 5000):
+    # TableHeuristic() gives the values of heuristic_2048
+    from bitboard import random_board, to_bitboard
+    rng = random.Random(1)
+    for _ in range(boards):
+        x = to_bitboard(random_board(rng))
+        expected = heuristic_2048(x)
+        value = TABLE_HEURISTIC(x)
+        assert value == expected, (x, value, expected)
+    # a board without moves
+    x = to_bitboard([[32, 64, 2, 16], [8, 32, 16, 2], [4, 16, 8, 4], [2, 8, 4, 2]])
+    assert TABLE_HEURISTIC(x) == heuristic_2048(x) == -float("INF")
+    print('heuristic: all tests passed')
+
+def benchmark(boards: int = 100000):
+    # evaluations per second of heuristic_2048 on bitboards and of the tables
+    from bitboard import random_board, to_bitboard
+    rng = random.Random(2)
+    positions = [to_bitboard(random_board(rng)) for _ in range(1000)] * (boards // 1000)
+    all_terms = TableHeuristic(monotonicity_weight=10 ** 6, smoothness_weight=10 ** 8, empty_weight=10 ** 10)
+    for name, h in (('heuristic_2048', heuristic_2048), ('TableHeuristic', TABLE_HEURISTIC),
+                    ('TableHeuristic, all terms', all_terms)):
+        t0 = time.perf_counter()
+        for x in positions:
+            h(x)
+        t1 = time.perf_counter()
+        print('{:26}: {:.0f} evaluations per second'.format(name, len(positions) / (t1 - t0)))
+
+if __name__ == '__main__':
+    test()
+    benchmark()
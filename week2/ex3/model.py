@@ -4,7 +4,6 @@ import itertools
 import math
 
 from collections import namedtuple
-from tkinter.constants import S
 from typing import List, Tuple, Union
 
 from copy import deepcopy
@@ -159,8 +158,46 @@ def test():
 def get_random_move() -> str:
     return random.choice(list(MERGE_FUNCTIONS.keys()))
 
-def get_expectimax_move(b: List[List[int]]) -> str:
-    depth = 4
+# the search of engines 'cache' and 'adaptive', with its cache kept between moves,
+# created on first use
+SEARCH = None
+# the worker processes of engine 'parallel', started on first use
+PARALLEL = None
+
+def get_expectimax_move(b: List[List[int]], depth: int = None, engine: str = 'lists',
+                        budget_ms: float = 100) -> str:
+    # the default is the original search on lists at depth 4, so the GUI of main.py plays
+    # as it always did; the other engines are chosen with engine:
+    # engine 'bitboard' searches on a bitboard (see bitboard.py), with the same values as
+    # the search on lists (engine 'lists'), but much faster
+    # engine 'cache' adds a transposition cache and pruning of unlikely spawns (see
+    # expectimax.py), fast enough for depth 6, its default; the others default to depth 4
+    # engine 'adaptive' chooses the depth by the board (or up to depth), and deepens until
+    # budget_ms (expectimax.BUDGET_MS by default); SEARCH.stats has the depth and nodes of the move
+    # engine 'parallel' skips moves that change nothing and searches the others, split
+    # by their spawns, in worker processes (see parallel.py), depth 6 by default
+    # the engines other than 'lists' are imported when they are used, so the GUI doesn't
+    # need NumPy (the tables of heuristic.py are built with it)
+    global SEARCH, PARALLEL
+    if engine != 'lists':
+        import bitboard
+        x = bitboard.to_bitboard(b)
+        if engine == 'parallel':
+            if PARALLEL is None:
+                import parallel
+                PARALLEL = parallel.ParallelExpectimax()
+            return PARALLEL.best_move(x, 6 if depth is None else depth)
+        if engine in ('adaptive', 'cache') and SEARCH is None:
+            import expectimax as cached_expectimax
+            SEARCH = cached_expectimax.ExpectimaxSearch()
+        if engine == 'adaptive':
+            return SEARCH.timed_move(x, budget_ms, depth)
+        if engine == 'cache':
+            return SEARCH.best_move(x, depth or 6)
+        if engine == 'bitboard':
+            return bitboard.get_expectimax_move(x, depth or 4)
+
+    depth = depth or 4
     heuristic = heuristic_2048
 
     # get result of every move
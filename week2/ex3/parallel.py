@@ -0,0 +1,140 @@
+import os
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+
+from bitboard import MOVE_FUNCTIONS, empty_cells
+from expectimax import ExpectimaxSearch, game_positions
+
+"""
+
+Parallel root evaluation for the 2048 expectimax.
+
+The root moves are independent subtrees, so they can be searched in worker processes.
+Moves that don't change the board are skipped (the serial searches score them like any
+other move). A board is one int, so sending it to a worker costs next to nothing.
+
+There are at most 4 root moves, often only 2 or 3 that change the board, and their
+subtrees differ a lot in size, so with split='spawns' the work is divided one layer
+deeper: every spawn of a 2 or a 4 in an empty cell after every root move is a task, and
+the value of a root move is the expectation over its spawns, as in
+ExpectimaxSearch.value. split='moves' sends one task per root move.
+
+Each worker keeps its own ExpectimaxSearch, with its transposition cache, between the
+moves of a game. The same position may be searched in several workers, which the serial
+search would find in its one cache; the speedup is less than the number of workers.
+Which worker searches which task varies, so the caches, and with the pruning the values,
+may differ a little from run to run.
+"""
+
+# the search of a worker process, with a cache of its own, set by init_worker
+worker_search = None
+
+def init_worker(cache_size: int, threshold: float):
+    global worker_search
+    worker_search = ExpectimaxSearch(cache_size=cache_size, threshold=threshold)
+
+def search_tasks(tasks: List[Tuple[int, int, bool, float]]) -> List[float]:
+    # the values of a batch of nodes (board, depth, player, probability)
+    return [worker_search.value(x, depth, player, probability) for x, depth, player, probability in tasks]
+
+def spawn_tasks(y: int, depth: int) -> List[Tuple[int, int, bool, float]]:
+    # the chance children of the board y after a root move, in the order of ExpectimaxSearch.value
+    cells = empty_cells(y)
+    n = len(cells)
+    tasks = []
+    for cell in cells:
+        shift = 4 * cell
+        tasks.append((y | 1 << shift, depth - 1, True, .9 / n))
+        tasks.append((y | 2 << shift, depth - 1, True, .1 / n))
+    return tasks
+
+class ParallelExpectimax:
+    # a pool of worker processes that search the root moves, keep it for many moves
+    def __init__(self, workers: int = None, split: str = 'spawns', cache_size: int = 2 ** 18,
+                 threshold: float = 1e-2):
+        if split not in ('moves', 'spawns'):
+            raise ValueError("split must be 'moves' or 'spawns', not {!r}".format(split))
+        self.workers = workers or os.cpu_count()
+        self.split = split
+        self.executor = ProcessPoolExecutor(self.workers, initializer=init_worker, initargs=(cache_size, threshold))
+
+    def shutdown(self):
+        self.executor.shutdown()
+
+    def best_move(self, x: int, depth: int) -> str:
+        # the move with the best value at depth, of the moves that change x
+        children = [(move, func(x)) for move, func in MOVE_FUNCTIONS.items()]
+        children = [(move, y) for move, y in children if y != x]
+        if not children:
+            return 'left'  # no move changes the board, the game is over
+        if len(children) == 1:
+            return children[0][0]
+
+        # a chance node of depth d has spawns of depth d - 1 below it, so split depth 0 by moves
+        if self.split == 'moves' or depth == 0:
+            tasks = [[(y, depth, False, 1.0)] for _, y in children]
+            values = [values[0] for values in self.executor.map(search_tasks, tasks)]
+        else:
+            per_move = [spawn_tasks(y, depth) for _, y in children]
+            tasks = [task for move_tasks in per_move for task in move_tasks]
+            # about 4 batches per worker, to balance the work without a task per spawn
+            size = max(1, len(tasks) // (4 * self.workers))
+            batches = [tasks[i:i + size] for i in range(0, len(tasks), size)]
+            results = [value for batch in self.executor.map(search_tasks, batches) for value in batch]
+            values = []
+            i = 0
+            for move_tasks in per_move:
+                values.append(sum(task[3] * value for task, value in zip(move_tasks, results[i:i + len(move_tasks)])))
+                i += len(move_tasks)
+        return max(zip(children, values), key=lambda r: r[1])[0][0]
+
+# -----------------------------------------------------------------------------
+# Benchmarking
+
+def benchmark(depths=(4, 5, 6), workers=(1, 2, 4), n: int = 20):
+    # ms per move of the serial ExpectimaxSearch and of the parallel root evaluation on
+    # the positions of a game, with fresh caches that are kept over the positions
+    positions = game_positions(n)
+    print('{} positions, {} cpus'.format(len(positions), os.cpu_count()))
+    for depth in depths:
+        search = ExpectimaxSearch()
+        t0 = time.perf_counter()
+        serial_moves = [search.best_move(x, depth) for x in positions]
+        serial = time.perf_counter() - t0
+        print('depth {}: serial {:.1f} ms per move'.format(depth, 1000 * serial / len(positions)))
+        for split in ('moves', 'spawns'):
+            for n_workers in workers:
+                parallel = ParallelExpectimax(n_workers, split)
+                # start the workers before timing
+                parallel.best_move(positions[0], 1)
+                t0 = time.perf_counter()
+                moves = [parallel.best_move(x, depth) for x in positions]
+                t1 = time.perf_counter()
+                parallel.shutdown()
+                print('depth {}: {:6} x {} workers: {:.1f} ms per move, speedup {:.2f}, same moves {}/{}'.format(
+                    depth, split, n_workers, 1000 * (t1 - t0) / len(positions), serial / (t1 - t0),
+                    sum(a == b for a, b in zip(moves, serial_moves)), len(positions)))
+
+def benchmark_selfplay(depths=(4, 5, 6), moves: int = 300, seed: int = 0):
+    # moves per second of self-play games (selfplay.play_game) with engine 'cache' and
+    # engine 'parallel' (all cores), the first moves of the same seeded game
+    import model
+    import selfplay
+    print('{} cpus'.format(os.cpu_count()))
+    for depth in depths:
+        serial = selfplay.play_game('cache', depth, None, seed, moves)
+        # fresh workers, like the cleared cache of engine 'cache'
+        if model.PARALLEL is not None:
+            model.PARALLEL.shutdown()
+            model.PARALLEL = None
+        parallel = selfplay.play_game('parallel', depth, None, seed, moves)
+        print('depth {}: cache {:.1f} moves per second, parallel {:.1f}, speedup {:.2f}'.format(
+            depth, serial.moves / serial.seconds, parallel.moves / parallel.seconds,
+            (parallel.moves / parallel.seconds) / (serial.moves / serial.seconds)))
+    model.PARALLEL.shutdown()
+
+if __name__ == '__main__':
+    benchmark()
+    benchmark_selfplay()
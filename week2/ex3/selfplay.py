@@ -0,0 +1,115 @@
+import argparse
+import os
+import random
+import time
+
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+import numpy as np
+
+import model
+
+"""
+
+Headless self-play for the 2048 AI.
+
+    python selfplay.py --games 1000 --workers 8 --engine adaptive --budget 100
+
+plays 1000 games in 8 worker processes with model.start, model.play_move and
+model.get_expectimax_move, without the Tk GUI of main.py (and without its 100 ms pause
+between moves), and reports:
+
+- the distribution of the largest tile at the end of the games
+- how many games reach 2048 and 4096
+- moves per second
+- percentiles of the time per move
+
+The spawns of the tiles come from the random module, seeded per game (seed, seed + 1,
+...), so the same options give the same games; the adaptive and parallel engines are the
+exception, their moves depend on timing and on the worker processes.
+
+run_selfplay returns the report as a Report, print_report prints it.
+"""
+
+# stop a game after this many moves; a game of 4096 takes about 2000 moves
+MAX_MOVES = 20000
+# the percentiles of the time per move in the report
+PERCENTILES = (50, 90, 99, 100)
+
+Game = namedtuple('Game', 'seed max_tile moves seconds latencies')
+Report = namedtuple('Report', 'games max_tiles reach moves_per_second latency')
+
+def max_tile(b: List[List[int]]) -> int:
+    return max(max(row) for row in b)
+
+def play_game(engine: str, depth: int, budget_ms: float, seed: int, max_moves: int = MAX_MOVES) -> Game:
+    # play one game and return its largest tile, moves and the time per move
+    random.seed(seed)
+    # an empty cache, so the moves of a game don't depend on the games this worker played before
+    if model.SEARCH is not None:
+        model.SEARCH.clear()
+    t0 = time.perf_counter()
+    b = model.start()
+    latencies = []
+    while model.move_exists(b) and len(latencies) < max_moves:
+        t1 = time.perf_counter()
+        direction = model.get_expectimax_move(b, depth, engine, budget_ms)
+        latencies.append(time.perf_counter() - t1)
+        new_b = model.play_move(b, direction)
+        if new_b == b:
+            break  # a move that changes nothing on a full board, the game is stuck
+        b = new_b
+    return Game(seed, max_tile(b), len(latencies), time.perf_counter() - t0, latencies)
+
+def run_selfplay(
+     games: int = 100,
+     engine: str = 'adaptive',
+     depth: int = None,
+     budget_ms: float = 100,
+     workers: int = None,
+     seed: int = 0
+) -> Report:
+    # play games in parallel and report on them
+    seeds = [seed + i for i in range(games)]
+    if engine == 'parallel':
+        # the engine has worker processes of its own, so the games are played one by one
+        results = [play_game(engine, depth, budget_ms, s) for s in seeds]
+    else:
+        with ProcessPoolExecutor(workers or os.cpu_count()) as executor:
+            results = list(executor.map(play_game, [engine] * games, [depth] * games, [budget_ms] * games, seeds))
+
+    latencies = [t for game in results for t in game.latencies]
+    moves = sum(game.moves for game in results)
+    return Report(
+        games,
+        dict(sorted(Counter(game.max_tile for game in results).items())),
+        {tile: sum(game.max_tile >= tile for game in results) / games for tile in (2048, 4096)},
+        moves / sum(game.seconds for game in results),
+        dict(zip(PERCENTILES, np.percentile(latencies, PERCENTILES).tolist())) if latencies else {},
+    )
+
+def print_report(report: Report):
+    print('{} games'.format(report.games))
+    print('max tile: ' + ', '.join('{} x{}'.format(tile, n) for tile, n in report.max_tiles.items()))
+    print('reached: ' + ', '.join('{} {:.1%}'.format(tile, rate) for tile, rate in report.reach.items()))
+    print('moves per second (per process): {:.1f}'.format(report.moves_per_second))
+    print('latency per move: ' + ', '.join('p{} {:.1f} ms'.format(p, 1000 * t) for p, t in report.latency.items()))
+
+def main(args: List[str] = None):
+    parser = argparse.ArgumentParser(description='Play headless 2048 games with the expectimax AI.')
+    parser.add_argument('-n', '--games', type=int, default=100)
+    parser.add_argument('--engine', choices=('adaptive', 'cache', 'parallel', 'bitboard', 'lists'), default='adaptive')
+    parser.add_argument('--depth', type=int, default=None, help='search depth (default: depends on the engine)')
+    parser.add_argument('--budget', type=float, default=100, help='ms per move of the adaptive engine')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='games played at once, one per process (default: one per core); '
+                        'the parallel engine plays one game at a time')
+    parser.add_argument('-s', '--seed', type=int, default=0)
+    options = parser.parse_args(args)
+
+    report = run_selfplay(options.games, options.engine, options.depth, options.budget, options.workers, options.seed)
+    print_report(report)
+
+if __name__ == '__main__':
+    main()